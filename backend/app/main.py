@@ -74,18 +74,14 @@ app.mount("/documents", StaticFiles(directory=str(DOCUMENTS_DIR)), name="documen
 # Mount the uploads-metadata.json file directly
 from fastapi import Response
 import json
+from app.utils.metadata import get_metadata
 
 @app.get("/uploads-metadata.json")
 async def get_uploads_metadata():
     """Serve the uploads metadata JSON file."""
     try:
-        metadata_file = Path("uploads-metadata.json")
-        if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-            return metadata
-        else:
-            return {"uploads": []}
+        # Served from memory: recent uploads are journaled and not yet in the file
+        return get_metadata()
     except Exception as e:
         return {"uploads": [], "error": str(e)}
 
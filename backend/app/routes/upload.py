@@ -5,6 +5,7 @@ import hashlib
 import os
 from pathlib import Path
 import shutil
+import uuid
 import io
 from datetime import datetime
 from ..utils.metadata import add_upload_metadata, remove_upload_metadata, get_all_uploads_metadata, update_objects_metadata
@@ -13,9 +14,9 @@ from ..utils.metadata import add_upload_metadata, remove_upload_metadata, get_al
 try:
     import pandas as pd
     from ..utils.sql_server_connection import sql_server
-    from ..utils.inspection_data_mapper import map_excel_to_database_columns, get_all_inspection_data_columns, filter_excel_columns_for_database
+    from ..utils.inspection_data_mapper import map_excel_to_database_columns, get_all_inspection_data_columns, filter_excel_columns_for_database, INSPECTION_DATA_CATEGORICAL_COLUMNS
     from ..utils.machine_tracking_mapper import map_excel_to_machine_tracking_columns, get_all_machine_tracking_columns, filter_excel_columns_for_machine_tracking
-    from ..utils.uc_lifetime_mapper import map_excel_to_uc_lifetime_columns, get_all_uc_lifetime_columns, filter_excel_columns_for_uc_lifetime
+    from ..utils.uc_lifetime_mapper import get_all_uc_lifetime_columns, resolve_uc_lifetime_columns
     SQL_SERVER_AVAILABLE = True
     print(f"✅ SQL Server dependencies loaded successfully - SQL_SERVER_AVAILABLE: {SQL_SERVER_AVAILABLE}")
 except ImportError as e:
@@ -354,64 +355,135 @@ def is_pdf_file(filename: str) -> bool:
     """Check if the file is a PDF based on file extension."""
     return get_file_extension(filename) == ".pdf"
 
+PDF_SIGNATURE = b'%PDF-'
+PDF_READ_CHUNK_SIZE = 1 << 20
+
 def validate_pdf_content(content: bytes) -> bool:
     """Validate PDF content by checking PDF signature."""
     # PDF files start with %PDF- signature
-    return content.startswith(b'%PDF-')
+    return content.startswith(PDF_SIGNATURE)
 
-async def save_pdf_file(file: UploadFile, content: bytes) -> dict:
+async def stage_pdf_file(file: UploadFile) -> dict:
     """
-    Save PDF file with MD5 hash as filename and return file info.
+    Validate an uploaded PDF and stream it into a temporary file in the
+    documents directory, hashing it on the way.
+    
+    Only the signature bytes are read before the file is accepted or
+    rejected, so invalid uploads are never read in full.
     
     Args:
         file: The uploaded file object
-        content: File content bytes
     
     Returns:
-        dict: File information including saved path and hash
+        dict: Staged file information including the temporary path and hash
     
     Raises:
-        HTTPException: If file is not a valid PDF
+        HTTPException: If the file is empty or is not a valid PDF
     """
     # Validate file extension
     if not is_pdf_file(file.filename):
         raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF file")
     
-    # Validate PDF content
-    if not validate_pdf_content(content):
+    # Validate PDF content from the signature bytes alone
+    head = await file.read(len(PDF_SIGNATURE))
+    if not head:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    if not validate_pdf_content(head):
         raise HTTPException(status_code=400, detail=f"File {file.filename} does not contain valid PDF content")
     
-    # Calculate MD5 hash
-    file_hash = calculate_md5(content)
+    # Hash and write in one pass; the temp file lives next to the target
+    # so it can be moved into place with an atomic rename
+    hasher = hashlib.md5(head)
+    size = len(head)
+    # Created like a plain open() would (0666 under the umask), so the stored
+    # PDF keeps the usual permissions after the rename
+    temp_path = DOCUMENTS_DIR / f"{uuid.uuid4().hex}.part"
+    fd = os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(head)
+            while chunk := await file.read(PDF_READ_CHUNK_SIZE):
+                hasher.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    
+    return {
+        "original_filename": file.filename,
+        "temp_path": str(temp_path),
+        "file_hash": hasher.hexdigest(),
+        "size": size,
+        "content_type": file.content_type
+    }
+
+def discard_staged_pdf(staged: dict) -> None:
+    """Remove the temporary file of a staged PDF upload."""
+    try:
+        os.unlink(staged["temp_path"])
+    except FileNotFoundError:
+        pass
+
+def commit_staged_pdf(staged: dict) -> dict:
+    """
+    Move a staged PDF to its MD5-hash filename in the documents directory.
+    
+    Args:
+        staged: Staged file information returned by stage_pdf_file
     
+    Returns:
+        dict: File information including saved path and hash
+    
+    Raises:
+        HTTPException: If a file with the same hash already exists
+    """
     # Create filename with MD5 hash + .pdf extension
+    file_hash = staged["file_hash"]
     hashed_filename = f"{file_hash}.pdf"
     file_path = DOCUMENTS_DIR / hashed_filename
     
     # Check if file already exists (duplicate detection)
-    file_exists = file_path.exists()
-    
-    if file_exists:
+    if file_path.exists():
         # File with same hash already exists, reject the upload
+        discard_staged_pdf(staged)
         raise HTTPException(
             status_code=409, 
             detail=f"A PDF file with the same content already exists (hash: {file_hash})"
         )
     
-    # Save file to documents directory
-    with open(file_path, "wb") as buffer:
-        buffer.write(content)
+    try:
+        os.replace(staged["temp_path"], file_path)
+    except OSError:
+        discard_staged_pdf(staged)
+        raise
     
     return {
-        "original_filename": file.filename,
+        "original_filename": staged["original_filename"],
         "saved_filename": hashed_filename,
         "file_path": str(file_path),
         "file_hash": file_hash,
-        "size": len(content),
-        "content_type": file.content_type,
+        "size": staged["size"],
+        "content_type": staged["content_type"],
         "storage_location": "documents"
     }
 
+async def save_pdf_file(file: UploadFile) -> dict:
+    """
+    Save PDF file with MD5 hash as filename and return file info.
+    
+    Args:
+        file: The uploaded file object
+    
+    Returns:
+        dict: File information including saved path and hash
+    
+    Raises:
+        HTTPException: If file is not a valid PDF or is a duplicate
+    """
+    staged = await stage_pdf_file(file)
+    return commit_staged_pdf(staged)
+
 @router.post("/upload-pdf")
 async def upload_pdf(file: UploadFile = File(...)):
     """
@@ -437,20 +509,14 @@ async def upload_pdf(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="No PDF file provided")
     
     try:
-        # Read the file content
-        content = await file.read()
-        
-        if not content:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty")
-        
-        # Save PDF file with duplicate detection
-        file_info = await save_pdf_file(file, content)
+        # Stream the PDF to disk with validation and duplicate detection
+        file_info = await save_pdf_file(file)
         
         # Add metadata for the uploaded PDF
         add_upload_metadata(
             original_filename=file.filename,
             stored_filename=file_info["saved_filename"],
-            file_size=len(content),
+            file_size=file_info["size"],
             storage_location="documents"
         )
         
@@ -487,48 +553,36 @@ async def upload_multiple_pdfs(files: List[UploadFile] = File(...)):
     
     uploaded_files = []
     total_size = 0
+    staged_files = []
     
     try:
-        # First pass: validate all files and check for duplicates
-        file_contents = []
+        # First pass: validate and stage all files, then check for duplicates
         for file in files:
             if not file.filename:
                 continue
             
-            # Read content
-            content = await file.read()
-            file_contents.append((file, content))
-            
-            # Validate file extension
-            if not is_pdf_file(file.filename):
-                raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF file")
-            
-            # Validate PDF content
-            if not validate_pdf_content(content):
-                raise HTTPException(status_code=400, detail=f"File {file.filename} does not contain valid PDF content")
-            
-            # Check for duplicate
-            file_hash = calculate_md5(content)
-            hashed_filename = f"{file_hash}.pdf"
-            file_path = DOCUMENTS_DIR / hashed_filename
-            
-            if file_path.exists():
+            staged_files.append(await stage_pdf_file(file))
+        
+        for staged in staged_files:
+            if (DOCUMENTS_DIR / f"{staged['file_hash']}.pdf").exists():
                 raise HTTPException(
                     status_code=409,
-                    detail=f"PDF file '{file.filename}' already exists (hash: {file_hash})"
+                    detail=f"PDF file '{staged['original_filename']}' already exists (hash: {staged['file_hash']})"
                 )
         
         # Second pass: save all files (only if all validations passed)
-        for file, content in file_contents:
-            file_info = await save_pdf_file(file, content)
+        while staged_files:
+            # Only dropped from the list once moved, so the cleanup below sees failures
+            file_info = commit_staged_pdf(staged_files[0])
+            staged_files.pop(0)
             uploaded_files.append(file_info)
-            total_size += len(content)
+            total_size += file_info["size"]
             
             # Add metadata
             add_upload_metadata(
-                original_filename=file.filename,
+                original_filename=file_info["original_filename"],
                 stored_filename=file_info["saved_filename"],
-                file_size=len(content),
+                file_size=file_info["size"],
                 storage_location="documents"
             )
         
@@ -547,6 +601,10 @@ async def upload_multiple_pdfs(files: List[UploadFile] = File(...)):
         raise  # Re-raise HTTP exceptions as-is
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF files: {str(e)}")
+    finally:
+        # Drop any staged files that were not moved into place
+        for staged in staged_files:
+            discard_staged_pdf(staged)
 
 @router.get("/documents")
 async def get_documents():
@@ -751,8 +809,7 @@ async def upload_knowledge(
         elif system_type == "Expected Lifetime":
             print("✅ Expected Lifetime branch selected - using UC_Life_Time table")
             # Expected Lifetime system - use UC_Life_Time table
-            df_filtered = filter_excel_columns_for_uc_lifetime(df)
-            column_mapping = map_excel_to_uc_lifetime_columns(df_filtered)
+            df_filtered, column_mapping = resolve_uc_lifetime_columns(df)
             df_mapped = df_filtered.rename(columns=column_mapping)
             all_db_columns = get_all_uc_lifetime_columns()
             target_table = "UC_Life_Time"
@@ -812,13 +869,18 @@ async def upload_knowledge(
             # Only keep columns that actually exist in the database, in database order
             # Use database column order to ensure consistent SQL parameter binding
             # Exclude ID column since it's auto-increment
-            available_columns = set(df_mapped.columns)
-            final_columns = [col for col in all_db_columns if col in available_columns and col != 'ID']
-            df_final = df_mapped[final_columns]
+            target_columns = pd.Index([col for col in all_db_columns if col != 'ID'])
+            final_columns = target_columns.intersection(df_mapped.columns, sort=False)
+            df_final = df_mapped.reindex(columns=final_columns)
             
             print(f"📊 Filtered to {len(final_columns)} existing database columns")
             print(f"📊 Final columns: {list(df_final.columns)[:10]}{'...' if len(df_final.columns) > 10 else ''}")
             
+            # Hold low-cardinality text columns as categoricals; the insert casts them back to object
+            categorical_columns = [col for col in df_final.columns if col in INSPECTION_DATA_CATEGORICAL_COLUMNS]
+            if categorical_columns:
+                df_final = df_final.astype(dict.fromkeys(categorical_columns, 'category'))
+            
             # Convert data types to match database schema
             print("🔄 Converting data types to match database schema...")
             
@@ -884,55 +946,37 @@ async def upload_knowledge(
         # Clean NULL values for pyodbc compatibility
         print("🧹 Cleaning NULL values for pyodbc compatibility...")
         
+        # Classify each column's dtype once, then dispatch on the kind
+        column_kinds = {}
+        for col, dtype in df_final.dtypes.items():
+            if pd.api.types.is_integer_dtype(dtype):
+                column_kinds[col] = 'int'
+            elif pd.api.types.is_float_dtype(dtype):
+                column_kinds[col] = 'float'
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                column_kinds[col] = 'datetime'
+            elif pd.api.types.is_object_dtype(dtype):
+                column_kinds[col] = 'object'
+        
         # Replace pandas NaT and numpy NaN with Python None
-        for col in df_final.columns:
-            # Handle datetime columns - replace NaT with None
-            if df_final[col].dtype == 'datetime64[ns]':
-                df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-                
-            # Handle nullable integer columns - replace <NA> with None  
-            elif str(df_final[col].dtype).startswith('Int'):
-                df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-                
-            # Handle float columns - replace NaN with None
-            elif df_final[col].dtype in ['float64', 'float32']:
-                df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-                
-            # Handle object columns - replace NaN with None
-            elif df_final[col].dtype == 'object':
+        for col, kind in column_kinds.items():
+            if kind == 'datetime':
+                # Box the whole column to Timestamps (datetime subclasses) at once; pyodbc
+                # binds those and None directly, so no per-cell conversion remains
+                df_final[col] = df_final[col].astype(object).where(df_final[col].notna(), None)
+            elif kind == 'object':
                 df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
         
         # Convert numpy types to native Python types to avoid pyodbc issues
         print("🔧 Converting numpy types to native Python types...")
         
-        for col in df_final.columns:
-            dtype_str = str(df_final[col].dtype)
-            
-            if dtype_str.startswith('Int') or dtype_str in ['int64', 'int32', 'int16', 'int8']:
-                # Convert all integer types (including numpy.int64) to Python int or None
-                def convert_int(x):
-                    if pd.isna(x) or x is None:
-                        return None
-                    try:
-                        return int(x)  # This converts numpy.int64 to Python int
-                    except (ValueError, TypeError):
-                        return None
-                        
-                df_final[col] = df_final[col].apply(convert_int)
-                print(f"  ✅ Converted {col} from {dtype_str} to Python int")
-                
-            elif dtype_str in ['float64', 'float32', 'float16']:
-                # Convert all float types to Python float or None
-                def convert_float(x):
-                    if pd.isna(x) or x is None:
-                        return None
-                    try:
-                        return float(x)
-                    except (ValueError, TypeError):
-                        return None
-                        
-                df_final[col] = df_final[col].apply(convert_float)
-                print(f"  ✅ Converted {col} from {dtype_str} to Python float")
+        for col, kind in column_kinds.items():
+            if kind in ('int', 'float'):
+                # Convert integer (including nullable Int64) and float columns to Python int/float
+                # or None in one C-level cast instead of a Python call per cell
+                dtype_str = str(df_final[col].dtype)
+                df_final[col] = df_final[col].to_numpy(dtype=object, na_value=None)
+                print(f"  ✅ Converted {col} from {dtype_str} to Python {kind}")
         
         print(f"✅ NULL value handling and type conversion completed")
         
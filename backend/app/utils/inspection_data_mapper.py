@@ -4,116 +4,138 @@ Membantu mapping kolom Excel ke field database yang sesuai
 Updated to match actual database schema (103 columns) - NO DUPLICATES
 """
 
+from functools import lru_cache
+
+# Every column in the InspectionData table, in database order; built once at import
+INSPECTION_DATA_COLUMNS = (
+    'ID',
+    'Inspection_ID',
+    'Machine_Type',
+    'Model_Code',
+    'Serial_No',
+    'Inspected_By',
+    'Link_Type',
+    'Link_Spec',
+    'Bushing_Spec',
+    'Track_Roller_Spec',
+    'Equipment_Number',
+    'SMR',
+    'Delivery_Date',
+    'Inspection_Date',
+    'Branch_Name',
+    'Customer_Name',
+    'Job_Site',
+    'Attachments',
+    'Comments',
+    'WorkingHourPerDay',
+    'UnderfootConditions_Terrain',
+    'UnderfootConditions_Abrasive',
+    'UnderfootConditions_Moisture',
+    'UnderfootConditions_Packing',
+    'ApplicationCode_Major',
+    'ApplicationCode_Minor',
+    'Application_Ground',
+    'Application_Working',
+    'LinkPitch_Brand_LHS',
+    'LinkPitch_Brand_RHS',
+    'LinkPitch_History_SMR_LHS',
+    'LinkPitch_History_SMR_RHS',
+    'LinkPitch_History_Date_LHS',
+    'LinkPitch_History_Date_RHS',
+    'LinkPitch_History_Hours_LHS',
+    'LinkPitch_History_Hours_RHS',
+    'LinkPitch_PercentWorn_LHS',
+    'LinkPitch_PercentWorn_RHS',
+    'LinkPitch_ReplaceDate_LHS',
+    'LinkPitch_ReplaceDate_RHS',
+    'Bushings_Brand_LHS',
+    'Bushings_Brand_RHS',
+    'Bushings_History_SMR_LHS',
+    'Bushings_History_SMR_RHS',
+    'Bushings_History_Date_LHS',
+    'Bushings_History_Date_RHS',
+    'Bushings_History_Hours_LHS',
+    'Bushings_History_Hours_RHS',
+    'Bushings_PercentWorn_LHS',
+    'Bushings_PercentWorn_RHS',
+    'Bushings_ReplaceDate_LHS',
+    'Bushings_ReplaceDate_RHS',
+    'LinkHeight_Brand_LHS',
+    'LinkHeight_Brand_RHS',
+    'LinkHeight_History_SMR_LHS',
+    'LinkHeight_History_SMR_RHS',
+    'LinkHeight_History_Date_LHS',
+    'LinkHeight_History_Date_RHS',
+    'LinkHeight_History_Hours_LHS',
+    'LinkHeight_History_Hours_RHS',
+    'LinkHeight_PercentWorn_LHS',
+    'LinkHeight_PercentWorn_RHS',
+    'LinkHeight_ReplaceDate_LHS',
+    'LinkHeight_ReplaceDate_RHS',
+    'TrackShoe_Type',
+    'TrackShoe_Width',
+    'TrackShoe_Width_Type',
+    'TrackShoe_Brand_LHS',
+    'TrackShoe_Brand_RHS',
+    'TrackShoe_History_SMR_LHS',
+    'TrackShoe_History_SMR_RHS',
+    'TrackShoe_History_Date_LHS',
+    'TrackShoe_History_Date_RHS',
+    'TrackShoe_History_Hours_LHS',
+    'TrackShoe_History_Hours_RHS',
+    'TrackShoe_PercentWorn_LHS',
+    'TrackShoe_PercentWorn_RHS',
+    'TrackShoe_ReplaceDate_LHS',
+    'TrackShoe_ReplaceDate_RHS',
+    'Idlers_Brand_LHS1',
+    'Idlers_Brand_RHS1',
+    'Idlers_History_SMR_LHS1',
+    'Idlers_History_SMR_RHS1',
+    'Idlers_History_Date_LHS1',
+    'Idlers_History_Date_RHS1',
+    'Idlers_History_Hours_LHS1',
+    'Idlers_History_Hours_RHS1',
+    'Idlers_PercentWorn_LHS1',
+    'Idlers_PercentWorn_RHS1',
+    'Idlers_ReplaceDate_LHS1',
+    'Idlers_ReplaceDate_RHS1',
+    'Sprocket_Brand_LHS',
+    'Sprocket_Brand_RHS',
+    'Sprocket_History_SMR_LHS',
+    'Sprocket_History_SMR_RHS',
+    'Sprocket_History_Date_LHS',
+    'Sprocket_History_Date_RHS',
+    'Sprocket_History_Hours_LHS',
+    'Sprocket_History_Hours_RHS',
+    'Sprocket_PercentWorn_RHS',
+    'Sprocket_PercentWorn_LHS',
+    'Sprocket_ReplaceDate_LHS',
+    'Sprocket_ReplaceDate_RHS'
+)
+
 def get_all_inspection_data_columns():
     """
     Returns list of all columns that exist in the InspectionData table.
     This matches the actual database schema exactly (103 columns).
     """
-    return [
-        'ID',
-        'Inspection_ID',
-        'Machine_Type',
-        'Model_Code',
-        'Serial_No',
-        'Inspected_By',
-        'Link_Type',
-        'Link_Spec',
-        'Bushing_Spec',
-        'Track_Roller_Spec',
-        'Equipment_Number',
-        'SMR',
-        'Delivery_Date',
-        'Inspection_Date',
-        'Branch_Name',
-        'Customer_Name',
-        'Job_Site',
-        'Attachments',
-        'Comments',
-        'WorkingHourPerDay',
-        'UnderfootConditions_Terrain',
-        'UnderfootConditions_Abrasive',
-        'UnderfootConditions_Moisture',
-        'UnderfootConditions_Packing',
-        'ApplicationCode_Major',
-        'ApplicationCode_Minor',
-        'Application_Ground',
-        'Application_Working',
-        'LinkPitch_Brand_LHS',
-        'LinkPitch_Brand_RHS',
-        'LinkPitch_History_SMR_LHS',
-        'LinkPitch_History_SMR_RHS',
-        'LinkPitch_History_Date_LHS',
-        'LinkPitch_History_Date_RHS',
-        'LinkPitch_History_Hours_LHS',
-        'LinkPitch_History_Hours_RHS',
-        'LinkPitch_PercentWorn_LHS',
-        'LinkPitch_PercentWorn_RHS',
-        'LinkPitch_ReplaceDate_LHS',
-        'LinkPitch_ReplaceDate_RHS',
-        'Bushings_Brand_LHS',
-        'Bushings_Brand_RHS',
-        'Bushings_History_SMR_LHS',
-        'Bushings_History_SMR_RHS',
-        'Bushings_History_Date_LHS',
-        'Bushings_History_Date_RHS',
-        'Bushings_History_Hours_LHS',
-        'Bushings_History_Hours_RHS',
-        'Bushings_PercentWorn_LHS',
-        'Bushings_PercentWorn_RHS',
-        'Bushings_ReplaceDate_LHS',
-        'Bushings_ReplaceDate_RHS',
-        'LinkHeight_Brand_LHS',
-        'LinkHeight_Brand_RHS',
-        'LinkHeight_History_SMR_LHS',
-        'LinkHeight_History_SMR_RHS',
-        'LinkHeight_History_Date_LHS',
-        'LinkHeight_History_Date_RHS',
-        'LinkHeight_History_Hours_LHS',
-        'LinkHeight_History_Hours_RHS',
-        'LinkHeight_PercentWorn_LHS',
-        'LinkHeight_PercentWorn_RHS',
-        'LinkHeight_ReplaceDate_LHS',
-        'LinkHeight_ReplaceDate_RHS',
-        'TrackShoe_Type',
-        'TrackShoe_Width',
-        'TrackShoe_Width_Type',
-        'TrackShoe_Brand_LHS',
-        'TrackShoe_Brand_RHS',
-        'TrackShoe_History_SMR_LHS',
-        'TrackShoe_History_SMR_RHS',
-        'TrackShoe_History_Date_LHS',
-        'TrackShoe_History_Date_RHS',
-        'TrackShoe_History_Hours_LHS',
-        'TrackShoe_History_Hours_RHS',
-        'TrackShoe_PercentWorn_LHS',
-        'TrackShoe_PercentWorn_RHS',
-        'TrackShoe_ReplaceDate_LHS',
-        'TrackShoe_ReplaceDate_RHS',
-        'Idlers_Brand_LHS1',
-        'Idlers_Brand_RHS1',
-        'Idlers_History_SMR_LHS1',
-        'Idlers_History_SMR_RHS1',
-        'Idlers_History_Date_LHS1',
-        'Idlers_History_Date_RHS1',
-        'Idlers_History_Hours_LHS1',
-        'Idlers_History_Hours_RHS1',
-        'Idlers_PercentWorn_LHS1',
-        'Idlers_PercentWorn_RHS1',
-        'Idlers_ReplaceDate_LHS1',
-        'Idlers_ReplaceDate_RHS1',
-        'Sprocket_Brand_LHS',
-        'Sprocket_Brand_RHS',
-        'Sprocket_History_SMR_LHS',
-        'Sprocket_History_SMR_RHS',
-        'Sprocket_History_Date_LHS',
-        'Sprocket_History_Date_RHS',
-        'Sprocket_History_Hours_LHS',
-        'Sprocket_History_Hours_RHS',
-        'Sprocket_PercentWorn_RHS',
-        'Sprocket_PercentWorn_LHS',
-        'Sprocket_ReplaceDate_LHS',
-        'Sprocket_ReplaceDate_RHS'
-    ]
+    return list(INSPECTION_DATA_COLUMNS)
+
+# Low-cardinality text columns (a handful of distinct values per upload),
+# held as pandas Categorical while the upload DataFrame is prepared
+INSPECTION_DATA_CATEGORICAL_COLUMNS = frozenset({
+    'Machine_Type',
+    'Model_Code',
+    'Link_Type',
+    'Branch_Name',
+    'UnderfootConditions_Terrain',
+    'UnderfootConditions_Abrasive',
+    'UnderfootConditions_Moisture',
+    'UnderfootConditions_Packing',
+    'Application_Ground',
+    'Application_Working',
+    'TrackShoe_Type',
+    'TrackShoe_Width_Type'
+})
 
 # Mapping kolom Excel ke field database InspectionData
 # CLEANED: No duplicates to prevent SQL parameter issues
@@ -298,14 +320,24 @@ def get_mapped_columns(excel_columns):
         excel_columns: List of column names from Excel file
         
     Returns:
-        dict: {excel_column: database_field} for mapped columns only
+        dict: {excel_column: database_field} for mapped columns only.
+        Each database field is mapped once, by the first Excel column that reaches it,
+        so two Excel columns are never renamed to the same field.
     """
+    return dict(_map_columns(tuple(excel_columns)))
+
+
+@lru_cache(maxsize=32)
+def _map_columns(excel_columns):
+    """Cached body of get_mapped_columns, keyed on the column tuple."""
     mapped = {}
+    seen_targets = set()
     for excel_col in excel_columns:
-        if excel_col in INSPECTION_DATA_FIELD_MAPPING:
-            db_field = INSPECTION_DATA_FIELD_MAPPING[excel_col]
+        db_field = INSPECTION_DATA_FIELD_MAPPING.get(excel_col)
+        if db_field is not None and db_field not in seen_targets:
             mapped[excel_col] = db_field
-    return mapped
+            seen_targets.add(db_field)
+    return tuple(mapped.items())
 
 
 def get_missing_columns(excel_columns, required_columns=None):
@@ -4,8 +4,13 @@ Metadata management for uploaded files.
 This module handles the creation and management of uploads-metadata.json file
 that stores information about uploaded files including original filename,
 stored filename, upload timestamp, and file size.
+
+Upload metadata is kept in memory. Each change is appended as one line to
+uploads-metadata.jsonl, and the full JSON file is only rewritten by
+flush_metadata() (called explicitly and at interpreter exit).
 """
 
+import atexit
 import json
 import os
 from datetime import datetime
@@ -15,48 +20,190 @@ from fastapi import HTTPException
 
 # Path to the metadata files
 METADATA_FILE_PATH = Path("uploads-metadata.json")
+METADATA_LOG_PATH = Path("uploads-metadata.jsonl")
 DOCUMENTS_METADATA_FILE_PATH = Path("metadata") / "documents-metadata.json"
 
 # Ensure metadata directory exists
 DOCUMENTS_METADATA_FILE_PATH.parent.mkdir(exist_ok=True)
 
-def get_metadata() -> Dict:
+def _write_json_atomic(path: Path, data: Dict) -> None:
+    """
+    Write JSON to a temporary file and atomically move it over the target.
+    
+    Readers therefore never see a partially written file.
+    
+    Args:
+        path: Destination JSON file
+        data: Data to serialize
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# In-process upload metadata, loaded once: records keyed by stored_filename
+# (in upload order), any other top-level keys of the JSON file, and the
+# serialized form handed to readers, rebuilt only after a change
+_uploads: Optional[Dict[str, Dict]] = None
+_metadata_extra: Dict = {}
+_metadata_json: Optional[str] = None
+
+def _apply_log_entry(entry: Dict) -> None:
+    """
+    Apply one journal entry to the in-memory uploads.
+    
+    Args:
+        entry: A decoded line of uploads-metadata.jsonl
+    """
+    op = entry.get("op")
+    if op == "add":
+        record = entry["record"]
+        _uploads[record["stored_filename"]] = record
+    elif op == "remove":
+        _uploads.pop(entry["stored_filename"], None)
+    elif op == "objects":
+        record = _uploads.get(entry["stored_filename"])
+        if record is not None:
+            record["objects"] = entry["objects"]
+
+def _load_metadata() -> Dict[str, Dict]:
     """
-    Read and return the current metadata from the JSON file.
+    Return the in-memory uploads, loading them on first use.
+    
+    The JSON snapshot is read once and the journal is replayed on top of it.
+    A torn last journal line (e.g. after a crash mid-write) is ignored.
     
     Returns:
-        dict: The metadata dictionary, or empty dict if file doesn't exist
+        dict: Upload records keyed by stored filename
     """
+    global _uploads, _metadata_extra
+    
+    if _uploads is not None:
+        return _uploads
+    
     try:
-        if METADATA_FILE_PATH.exists():
-            with open(METADATA_FILE_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            return {"uploads": []}
+        with open(METADATA_FILE_PATH, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
     except (json.JSONDecodeError, IOError) as e:
-        # If there's an error reading the file, create a new empty structure
-        return {"uploads": []}
+        # If there's an error reading the file, start from an empty structure
+        snapshot = {"uploads": []}
+    
+    _uploads = {record["stored_filename"]: record for record in snapshot.pop("uploads", [])}
+    _metadata_extra = snapshot
+    
+    try:
+        with open(METADATA_LOG_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    _apply_log_entry(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    continue
+    except IOError:
+        pass
+    
+    return _uploads
 
-def save_metadata(metadata: Dict) -> None:
+def _append_log_entry(entry: Dict) -> None:
     """
-    Save the metadata dictionary to the JSON file.
+    Apply a change in memory and append it to the journal as one line.
     
     Args:
-        metadata: The metadata dictionary to save
+        entry: The change to record
+    
+    Raises:
+        HTTPException: If the journal can't be written
+    """
+    global _metadata_json
+    
+    _load_metadata()
+    try:
+        with open(METADATA_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"Error saving metadata: {str(e)}")
+    
+    _apply_log_entry(entry)
+    _metadata_json = None
+
+def _serialized_metadata() -> str:
+    """
+    Return the uploads metadata serialized as JSON, reusing it until the next change.
+    
+    Returns:
+        str: JSON text of the full metadata dictionary
+    """
+    global _metadata_json
+    
+    if _metadata_json is None:
+        uploads = _load_metadata()
+        _metadata_json = json.dumps({**_metadata_extra, "uploads": list(uploads.values())}, ensure_ascii=False)
+    return _metadata_json
+
+def get_metadata() -> Dict:
+    """
+    Return the current uploads metadata.
+    
+    The result is decoded from a cached JSON string, so each caller gets
+    its own copy that it may change freely.
+    
+    Returns:
+        dict: The metadata dictionary, or empty dict if file doesn't exist
+    """
+    return json.loads(_serialized_metadata())
+
+def flush_metadata() -> None:
+    """
+    Write the in-memory uploads metadata to the JSON file and clear the journal.
     
     Raises:
         HTTPException: If there's an error saving the file
     """
+    if _uploads is None:
+        return
+    
     try:
-        with open(METADATA_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        _write_json_atomic(METADATA_FILE_PATH, json.loads(_serialized_metadata()))
+        # The snapshot now holds every journaled change
+        with open(METADATA_LOG_PATH, 'w', encoding='utf-8'):
+            pass
     except IOError as e:
         raise HTTPException(status_code=500, detail=f"Error saving metadata: {str(e)}")
 
+def _flush_metadata_at_exit() -> None:
+    """Compact the journal on interpreter exit; the journal stays valid if this fails."""
+    try:
+        flush_metadata()
+    except HTTPException:
+        pass
+
+atexit.register(_flush_metadata_at_exit)
+
+def save_metadata(metadata: Dict) -> None:
+    """
+    Replace the uploads metadata and write it to the JSON file.
+    
+    Args:
+        metadata: The metadata dictionary to save
+    
+    Raises:
+        HTTPException: If there's an error saving the file
+    """
+    global _uploads, _metadata_extra, _metadata_json
+    
+    snapshot = json.loads(json.dumps(metadata))
+    _uploads = {record["stored_filename"]: record for record in snapshot.pop("uploads", [])}
+    _metadata_extra = snapshot
+    _metadata_json = None
+    flush_metadata()
+
 def add_upload_metadata(original_filename: str, stored_filename: str, file_size: int, objects: List[Dict] = None, storage_location: str = "uploads") -> None:
     """
     Add metadata for a newly uploaded file.
     
+    An existing record with the same stored filename is replaced in place.
+    
     Args:
         original_filename: The original name of the uploaded file
         stored_filename: The filename used to store the file (MD5 hash + extension)
@@ -64,8 +211,6 @@ def add_upload_metadata(original_filename: str, stored_filename: str, file_size:
         objects: List of detected objects from object detection API (optional)
         storage_location: Directory where the file is stored ("uploads" or "documents")
     """
-    metadata = get_metadata()
-    
     upload_record = {
         "original_filename": original_filename,
         "stored_filename": stored_filename,
@@ -75,21 +220,7 @@ def add_upload_metadata(original_filename: str, stored_filename: str, file_size:
         "objects": objects or []
     }
     
-    # Check if this file already exists in metadata (by stored_filename)
-    existing_index = None
-    for i, record in enumerate(metadata["uploads"]):
-        if record["stored_filename"] == stored_filename:
-            existing_index = i
-            break
-    
-    if existing_index is not None:
-        # Update existing record (in case of overwrite)
-        metadata["uploads"][existing_index] = upload_record
-    else:
-        # Add new record
-        metadata["uploads"].append(upload_record)
-    
-    save_metadata(metadata)
+    _append_log_entry({"op": "add", "record": upload_record})
 
 def remove_upload_metadata(stored_filename: str) -> bool:
     """
@@ -101,34 +232,25 @@ def remove_upload_metadata(stored_filename: str) -> bool:
     Returns:
         bool: True if the record was found and removed, False otherwise
     """
-    metadata = get_metadata()
+    if stored_filename not in _load_metadata():
+        return False
     
-    # Find and remove the record
-    for i, record in enumerate(metadata["uploads"]):
-        if record["stored_filename"] == stored_filename:
-            del metadata["uploads"][i]
-            save_metadata(metadata)
-            return True
-    
-    return False
+    _append_log_entry({"op": "remove", "stored_filename": stored_filename})
+    return True
 
 def get_file_metadata(stored_filename: str) -> Optional[Dict]:
     """
     Get metadata for a specific file.
     
+    The record is the in-memory one and must be treated as read-only.
+    
     Args:
         stored_filename: The stored filename to look up
         
     Returns:
         dict or None: The file metadata if found, None otherwise
     """
-    metadata = get_metadata()
-    
-    for record in metadata["uploads"]:
-        if record["stored_filename"] == stored_filename:
-            return record
-    
-    return None
+    return _load_metadata().get(stored_filename)
 
 def update_objects_metadata(stored_filename: str, objects: List[Dict]) -> bool:
     """
@@ -141,16 +263,11 @@ def update_objects_metadata(stored_filename: str, objects: List[Dict]) -> bool:
     Returns:
         bool: True if the record was found and updated, False otherwise
     """
-    metadata = get_metadata()
+    if stored_filename not in _load_metadata():
+        return False
     
-    # Find and update the record
-    for record in metadata["uploads"]:
-        if record["stored_filename"] == stored_filename:
-            record["objects"] = objects
-            save_metadata(metadata)
-            return True
-    
-    return False
+    _append_log_entry({"op": "objects", "stored_filename": stored_filename, "objects": objects})
+    return True
 
 def get_all_uploads_metadata() -> List[Dict]:
     """
@@ -159,8 +276,7 @@ def get_all_uploads_metadata() -> List[Dict]:
     Returns:
         list: List of all upload metadata records
     """
-    metadata = get_metadata()
-    return metadata.get("uploads", [])
+    return get_metadata()["uploads"]
 
 def get_documents_metadata() -> Dict:
     """
@@ -190,8 +306,7 @@ def save_documents_metadata(metadata: Dict) -> None:
         HTTPException: If there's an error saving the file
     """
     try:
-        with open(DOCUMENTS_METADATA_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        _write_json_atomic(DOCUMENTS_METADATA_FILE_PATH, metadata)
     except IOError as e:
         raise HTTPException(status_code=500, detail=f"Error saving documents metadata: {str(e)}")
 
@@ -3,16 +3,69 @@ PDF metadata management for embeddings.
 
 This module handles the creation, storage, and management of metadata
 for PDF documents that have been processed for embeddings.
+
+Metadata is stored in a single SQLite database (WAL mode) with one row
+per document, so listing and searching do not need to parse a JSON file
+per document.
 """
 
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from fastapi import HTTPException
 
 
+# Columns returned by list_pdf_metadata, in order
+SUMMARY_COLUMNS = (
+    "file_hash",
+    "original_filename",
+    "upload_date",
+    "page_count",
+    "chunk_count",
+    "status",
+    "faiss_filename",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    file_hash TEXT PRIMARY KEY,
+    original_filename TEXT,
+    upload_date TEXT,
+    page_count INTEGER,
+    chunk_count INTEGER,
+    status TEXT,
+    faiss_filename TEXT,
+    search_blob TEXT NOT NULL,
+    full_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_original_filename ON docs(original_filename);
+CREATE INDEX IF NOT EXISTS idx_docs_upload_date ON docs(upload_date);
+"""
+
+_UPSERT_SQL = (
+    "INSERT OR REPLACE INTO docs "
+    "(file_hash, original_filename, upload_date, page_count, chunk_count, status, faiss_filename, search_blob, full_json) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_SELECT_SUMMARY_SQL = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM docs"
+
+# Rows fetched per lock acquisition when streaming summaries
+ITER_BATCH_SIZE = 256
+
+# Stored as PRAGMA user_version; bump when the search_blob contents change
+SEARCH_BLOB_VERSION = 1
+
+
+def _py_lower(value):
+    """Lowercase a column value the way Python's str.lower() does (SQL function py_lower)."""
+    return None if value is None else str(value).lower()
+
+
 class PDFMetadataManager:
     """Manager for PDF metadata storage and retrieval."""
     
@@ -21,10 +74,108 @@ class PDFMetadataManager:
         Initialize PDF metadata manager.
         
         Args:
-            metadata_dir: Directory to store metadata JSON files
+            metadata_dir: Directory holding the metadata database
         """
         self.metadata_dir = Path(metadata_dir)
         self.metadata_dir.mkdir(exist_ok=True)
+        self.db_path = self.metadata_dir / "metadata.db"
+        
+        # One shared connection; sqlite3 caches prepared statements per connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # SQLite's lower() only folds ASCII; field searches use Python's Unicode-aware lowering
+        self._conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+        self._conn.executescript(_SCHEMA)
+        self._rebuild_search_blobs()
+        
+        self._import_legacy_metadata()
+    
+    @staticmethod
+    def _build_search_blob(summary: tuple) -> str:
+        """
+        Build the lowercased text searched by search_metadata.
+        
+        The blob holds the same fields list_pdf_metadata returns, so a
+        search without a field matches on any summary value. Values are
+        separated by newlines so a query can't match across two fields.
+        
+        Args:
+            summary: Summary column values, in SUMMARY_COLUMNS order
+            
+        Returns:
+            str: Newline-separated, lowercased summary values
+        """
+        return "\n".join(str(value) for value in summary).lower()
+    
+    @classmethod
+    def _build_row(cls, file_hash: str, metadata: Dict) -> tuple:
+        """
+        Build the docs table row for a metadata dictionary.
+        
+        Args:
+            file_hash: MD5 hash of the file
+            metadata: Full metadata dictionary
+            
+        Returns:
+            tuple: Parameters for the upsert statement
+        """
+        summary = (
+            file_hash,
+            metadata.get("file_info", {}).get("original_filename", ""),
+            metadata.get("file_info", {}).get("upload_date", ""),
+            metadata.get("content_info", {}).get("page_count", 0),
+            metadata.get("content_info", {}).get("chunk_count", 0),
+            metadata.get("processing_status", {}).get("status", "unknown"),
+            metadata.get("vector_storage", {}).get("faiss_filename", ""),
+        )
+        return summary + (
+            cls._build_search_blob(summary),
+            json.dumps(metadata, ensure_ascii=False),
+        )
+    
+    def _rebuild_search_blobs(self) -> None:
+        """Recompute search_blob for databases written before it held every summary field."""
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= SEARCH_BLOB_VERSION:
+                return
+            
+            rows = [
+                # search_blob is the second-to-last value of a docs row
+                (self._build_row(file_hash, json.loads(full_json))[-2], file_hash)
+                for file_hash, full_json in self._conn.execute("SELECT file_hash, full_json FROM docs")
+            ]
+            self._conn.execute("BEGIN")
+            self._conn.executemany("UPDATE docs SET search_blob = ? WHERE file_hash = ?", rows)
+            self._conn.execute(f"PRAGMA user_version = {SEARCH_BLOB_VERSION}")
+            self._conn.execute("COMMIT")
+    
+    def _import_legacy_metadata(self) -> None:
+        """Import per-file *_metadata.json files written by earlier versions."""
+        legacy_files = list(self.metadata_dir.glob("*_metadata.json"))
+        if not legacy_files:
+            return
+        
+        with self._lock:
+            existing = {row[0] for row in self._conn.execute("SELECT file_hash FROM docs")}
+            rows = []
+            
+            for metadata_file in legacy_files:
+                file_hash = metadata_file.name[:-len("_metadata.json")]
+                if file_hash in existing:
+                    continue
+                
+                try:
+                    with open(metadata_file, 'r', encoding='utf-8') as f:
+                        rows.append(self._build_row(file_hash, json.load(f)))
+                except Exception as e:
+                    print(f"Warning: Failed to import metadata file {metadata_file}: {str(e)}")
+            
+            if rows:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(_UPSERT_SQL, rows)
+                self._conn.execute("COMMIT")
     
     def create_pdf_metadata(self, 
                           file_hash: str,
@@ -51,13 +202,15 @@ class PDFMetadataManager:
         Returns:
             Dict: Complete metadata dictionary
         """
+        now = datetime.now().isoformat()
+        
         metadata = {
             # File information
             "file_info": {
                 "file_hash": file_hash,
                 "original_filename": original_filename,
                 "stored_filename": stored_filename,
-                "upload_date": datetime.now().isoformat(),
+                "upload_date": now,
                 "file_size": pdf_metadata.get("file_size", 0),
                 "file_path": f"documents/{stored_filename}"
             },
@@ -81,7 +234,7 @@ class PDFMetadataManager:
                 "api_version": embeddings_info.get("api_version", ""),
                 "endpoint": embeddings_info.get("endpoint", ""),
                 "embedding_dimension": len(chunks) if chunks else 0,
-                "processing_date": datetime.now().isoformat()
+                "processing_date": now
             },
             
             # FAISS storage information
@@ -95,35 +248,34 @@ class PDFMetadataManager:
             # Processing status
             "processing_status": {
                 "status": "completed",
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "created_at": now,
+                "updated_at": now,
                 "version": "1.0"
             }
         }
         
         return metadata
     
+    
     def save_pdf_metadata(self, file_hash: str, metadata: Dict) -> Path:
         """
-        Save PDF metadata to JSON file.
+        Save PDF metadata to the metadata database.
         
         Args:
-            file_hash: MD5 hash to use as filename
+            file_hash: MD5 hash used as the primary key
             metadata: Metadata dictionary to save
             
         Returns:
-            Path: Path to the saved metadata file
+            Path: Path to the metadata database
             
         Raises:
             HTTPException: If saving fails
         """
         try:
-            metadata_file = self.metadata_dir / f"{file_hash}_metadata.json"
-            
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                self._conn.execute(_UPSERT_SQL, self._build_row(file_hash, metadata))
             
-            return metadata_file
+            return self.db_path
             
         except Exception as e:
             raise HTTPException(
@@ -133,7 +285,7 @@ class PDFMetadataManager:
     
     def load_pdf_metadata(self, file_hash: str) -> Dict:
         """
-        Load PDF metadata from JSON file.
+        Load PDF metadata from the metadata database.
         
         Args:
             file_hash: MD5 hash of the file
@@ -145,13 +297,15 @@ class PDFMetadataManager:
             HTTPException: If loading fails
         """
         try:
-            metadata_file = self.metadata_dir / f"{file_hash}_metadata.json"
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT full_json FROM docs WHERE file_hash = ?", (file_hash,)
+                ).fetchone()
             
-            if not metadata_file.exists():
-                raise FileNotFoundError(f"Metadata file not found: {metadata_file}")
+            if row is None:
+                raise FileNotFoundError(f"Metadata not found: {file_hash}")
             
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json.loads(row[0])
                 
         except Exception as e:
             raise HTTPException(
@@ -159,40 +313,54 @@ class PDFMetadataManager:
                 detail=f"Failed to load PDF metadata: {str(e)}"
             )
     
+    def _iter_summaries(self, where: str = "", params: tuple = ()) -> Iterator[Dict]:
+        """
+        Stream metadata summaries matching an optional WHERE clause.
+        
+        Rows are fetched in batches so the connection lock is never held
+        while the caller consumes results.
+        
+        Args:
+            where: SQL condition (without the WHERE keyword)
+            params: Parameters for the condition
+            
+        Yields:
+            Dict: Metadata summary
+        """
+        query = _SELECT_SUMMARY_SQL
+        if where:
+            query += f" WHERE {where}"
+        query += " ORDER BY upload_date"
+        
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+        
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(ITER_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(SUMMARY_COLUMNS, row))
+    
+    def iter_pdf_metadata(self) -> Iterator[Dict]:
+        """
+        Iterate over all PDF metadata summaries without materializing them.
+        
+        Returns:
+            Iterator[Dict]: Lazily fetched metadata summaries
+        """
+        return self._iter_summaries()
+    
     def list_pdf_metadata(self) -> List[Dict]:
         """
-        List all PDF metadata files.
+        List all PDF metadata summaries.
         
         Returns:
             List[Dict]: List of metadata summaries
         """
         try:
-            metadata_files = list(self.metadata_dir.glob("*_metadata.json"))
-            metadata_list = []
-            
-            for metadata_file in metadata_files:
-                try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    # Create summary
-                    summary = {
-                        "file_hash": metadata.get("file_info", {}).get("file_hash", ""),
-                        "original_filename": metadata.get("file_info", {}).get("original_filename", ""),
-                        "upload_date": metadata.get("file_info", {}).get("upload_date", ""),
-                        "page_count": metadata.get("content_info", {}).get("page_count", 0),
-                        "chunk_count": metadata.get("content_info", {}).get("chunk_count", 0),
-                        "status": metadata.get("processing_status", {}).get("status", "unknown"),
-                        "faiss_filename": metadata.get("vector_storage", {}).get("faiss_filename", "")
-                    }
-                    
-                    metadata_list.append(summary)
-                    
-                except Exception as e:
-                    print(f"Warning: Failed to read metadata file {metadata_file}: {str(e)}")
-                    continue
-            
-            return metadata_list
+            return list(self.iter_pdf_metadata())
             
         except Exception as e:
             print(f"Warning: Failed to list PDF metadata: {str(e)}")
@@ -216,16 +384,15 @@ class PDFMetadataManager:
             # Load existing metadata
             metadata = self.load_pdf_metadata(file_hash)
             
-            # Apply updates recursively
-            def update_nested_dict(original: Dict, updates: Dict) -> Dict:
-                for key, value in updates.items():
-                    if isinstance(value, dict) and key in original and isinstance(original[key], dict):
-                        original[key] = update_nested_dict(original[key], value)
+            # Apply nested updates with an explicit stack instead of recursion
+            stack = [(metadata, updates)]
+            while stack:
+                target, source = stack.pop()
+                for key, value in source.items():
+                    if isinstance(value, dict) and isinstance(target.get(key), dict):
+                        stack.append((target[key], value))
                     else:
-                        original[key] = value
-                return original
-            
-            metadata = update_nested_dict(metadata, updates)
+                        target[key] = value
             
             # Update timestamp
             metadata["processing_status"]["updated_at"] = datetime.now().isoformat()
@@ -243,7 +410,7 @@ class PDFMetadataManager:
     
     def delete_pdf_metadata(self, file_hash: str) -> bool:
         """
-        Delete PDF metadata file.
+        Delete PDF metadata.
         
         Args:
             file_hash: MD5 hash of the file
@@ -252,13 +419,15 @@ class PDFMetadataManager:
             bool: True if deletion was successful
         """
         try:
-            metadata_file = self.metadata_dir / f"{file_hash}_metadata.json"
+            with self._lock:
+                cursor = self._conn.execute("DELETE FROM docs WHERE file_hash = ?", (file_hash,))
             
-            if metadata_file.exists():
-                metadata_file.unlink()
-                return True
+            # Drop any legacy JSON file so it is not re-imported on next start
+            legacy_file = self.metadata_dir / f"{file_hash}_metadata.json"
+            if legacy_file.exists():
+                legacy_file.unlink()
             
-            return False
+            return cursor.rowcount > 0
             
         except Exception as e:
             print(f"Warning: Failed to delete PDF metadata {file_hash}: {str(e)}")
@@ -276,23 +445,16 @@ class PDFMetadataManager:
             List[Dict]: List of matching metadata summaries
         """
         try:
-            all_metadata = self.list_pdf_metadata()
-            matching_metadata = []
-            
-            query_lower = query.lower()
-            
-            for metadata in all_metadata:
-                if field:
-                    # Search in specific field
-                    if field in metadata and query_lower in str(metadata[field]).lower():
-                        matching_metadata.append(metadata)
-                else:
-                    # Search in all fields
-                    metadata_str = json.dumps(metadata).lower()
-                    if query_lower in metadata_str:
-                        matching_metadata.append(metadata)
+            if field:
+                # Search in specific field
+                if field not in SUMMARY_COLUMNS:
+                    return []
+                searched = f"py_lower({field})"
+            else:
+                # Search in the precomputed lowercase blob
+                searched = "search_blob"
             
-            return matching_metadata
+            return list(self._iter_summaries(f"instr({searched}, ?) > 0", (query.lower(),)))
             
         except Exception as e:
             print(f"Warning: Failed to search PDF metadata: {str(e)}")
@@ -300,4 +462,4 @@ class PDFMetadataManager:
 
 
 # Global instance to be used throughout the application
-pdf_metadata_manager = PDFMetadataManager()
\ No newline at end of file
+pdf_metadata_manager = PDFMetadataManager()
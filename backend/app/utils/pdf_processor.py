@@ -8,6 +8,7 @@ for embedding generation purposes.
 import os
 import hashlib
 import tiktoken
+from functools import lru_cache
 from typing import List, Dict, Optional
 from pathlib import Path
 from PyPDF2 import PdfReader
@@ -29,19 +30,22 @@ def extract_text_from_pdf(file_path: Path) -> str:
     """
     try:
         reader = PdfReader(file_path)
-        text = ""
+        parts: List[str] = []
         
         for page_num, page in enumerate(reader.pages):
             try:
                 page_text = page.extract_text()
                 if page_text.strip():
-                    text += f"\n--- Page {page_num + 1} ---\n"
-                    text += page_text
-                    text += "\n"
+                    parts.append(f"\n--- Page {page_num + 1} ---\n")
+                    parts.append(page_text)
+                    parts.append("\n")
             except Exception as e:
                 print(f"Warning: Could not extract text from page {page_num + 1}: {str(e)}")
                 continue
         
+        # Join once instead of re-allocating the string on every page
+        text = "".join(parts)
+        
         if not text.strip():
             raise HTTPException(status_code=400, detail="No text content could be extracted from PDF")
             
@@ -53,6 +57,17 @@ def extract_text_from_pdf(file_path: Path) -> str:
         raise HTTPException(status_code=500, detail=f"Error extracting text from PDF: {str(e)}")
 
 
+@lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding":
+    """
+    Get the tiktoken encoding used for chunking, loading it only once.
+    
+    Returns:
+        tiktoken.Encoding: The cl100k_base encoding
+    """
+    return tiktoken.get_encoding("cl100k_base")
+
+
 def chunk_text(text: str, max_tokens: int = 8000, overlap: int = 200) -> List[str]:
     """
     Split text into chunks suitable for embedding generation.
@@ -67,30 +82,23 @@ def chunk_text(text: str, max_tokens: int = 8000, overlap: int = 200) -> List[st
     """
     try:
         # Use tiktoken to count tokens (assuming gpt-3.5-turbo encoding)
-        encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = _get_encoding()
         tokens = encoding.encode(text)
         
         if len(tokens) <= max_tokens:
             return [text]
         
-        chunks = []
-        start = 0
-        
-        while start < len(tokens):
-            # Calculate end position
+        # Compute token windows up front and decode each slice exactly once
+        step = max_tokens - overlap
+        boundaries = []
+        for start in range(0, len(tokens), step):
             end = min(start + max_tokens, len(tokens))
-            
-            # Get chunk tokens
-            chunk_tokens = tokens[start:end]
-            
-            # Decode back to text
-            chunk_text = encoding.decode(chunk_tokens)
-            chunks.append(chunk_text.strip())
-            
-            # Move start position with overlap
+            boundaries.append((start, end))
             if end >= len(tokens):
                 break
-            start = end - overlap
+        
+        chunks = encoding.decode_batch([tokens[start:end] for start, end in boundaries])
+        chunks = [chunk.strip() for chunk in chunks]
             
         return chunks
         
@@ -119,61 +127,78 @@ def chunk_text(text: str, max_tokens: int = 8000, overlap: int = 200) -> List[st
         return chunks
 
 
+# Characters encoded per hash update, so large texts are never copied whole
+HASH_CHUNK_CHARS = 1 << 20
+
+
 def calculate_content_hash(content: str) -> str:
     """
-    Calculate MD5 hash of text content.
+    Calculate a BLAKE2b (128-bit) hash of text content.
     
     Args:
         content: Text content to hash
         
     Returns:
-        str: MD5 hash of the content
+        str: Hex digest of the content (32 characters)
     """
-    return hashlib.md5(content.encode('utf-8')).hexdigest()
+    digest = hashlib.blake2b(digest_size=16)
+    for start in range(0, len(content), HASH_CHUNK_CHARS):
+        digest.update(content[start:start + HASH_CHUNK_CHARS].encode('utf-8'))
+    return digest.hexdigest()
 
 
-def get_pdf_metadata(file_path: Path, content: str) -> Dict:
+def get_pdf_metadata_only(file_path: Path) -> Dict:
     """
-    Extract metadata from PDF file and content.
+    Read PDF metadata without extracting any page text.
+    
+    Only the document info dictionary and the page tree are read, so this
+    stays cheap for large PDFs when the text content is not needed.
     
     Args:
         file_path: Path to the PDF file
-        content: Extracted text content
         
     Returns:
-        Dict: Metadata information about the PDF
+        Dict: File and document-level metadata (no content fields)
     """
+    metadata = {
+        "file_name": file_path.name,
+        "file_size": os.stat(file_path).st_size,
+        "page_count": 0,
+        "pdf_title": "",
+        "pdf_author": "",
+        "pdf_subject": "",
+        "pdf_creator": "",
+    }
+    
     try:
         reader = PdfReader(file_path)
-        file_stat = os.stat(file_path)
-        
-        # Try to get PDF metadata
         pdf_info = reader.metadata if reader.metadata else {}
         
-        metadata = {
-            "file_name": file_path.name,
-            "file_size": file_stat.st_size,
-            "page_count": len(reader.pages),
-            "content_hash": calculate_content_hash(content),
-            "content_length": len(content),
-            "pdf_title": pdf_info.get("/Title", "") if pdf_info else "",
-            "pdf_author": pdf_info.get("/Author", "") if pdf_info else "",
-            "pdf_subject": pdf_info.get("/Subject", "") if pdf_info else "",
-            "pdf_creator": pdf_info.get("/Creator", "") if pdf_info else "",
-        }
-        
-        return metadata
+        metadata["page_count"] = len(reader.pages)
+        metadata["pdf_title"] = pdf_info.get("/Title", "") if pdf_info else ""
+        metadata["pdf_author"] = pdf_info.get("/Author", "") if pdf_info else ""
+        metadata["pdf_subject"] = pdf_info.get("/Subject", "") if pdf_info else ""
+        metadata["pdf_creator"] = pdf_info.get("/Creator", "") if pdf_info else ""
         
     except Exception as e:
         print(f"Warning: Could not extract PDF metadata: {str(e)}")
-        return {
-            "file_name": file_path.name,
-            "file_size": os.stat(file_path).st_size,
-            "page_count": 0,
-            "content_hash": calculate_content_hash(content),
-            "content_length": len(content),
-            "pdf_title": "",
-            "pdf_author": "",
-            "pdf_subject": "",
-            "pdf_creator": "",
-        }
\ No newline at end of file
+    
+    return metadata
+
+
+def get_pdf_metadata(file_path: Path, content: str) -> Dict:
+    """
+    Extract metadata from PDF file and content.
+    
+    Args:
+        file_path: Path to the PDF file
+        content: Extracted text content
+        
+    Returns:
+        Dict: Metadata information about the PDF
+    """
+    metadata = get_pdf_metadata_only(file_path)
+    metadata["content_hash"] = calculate_content_hash(content)
+    metadata["content_length"] = len(content)
+    
+    return metadata
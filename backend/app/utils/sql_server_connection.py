@@ -3,38 +3,130 @@ import pyodbc
 import pandas as pd
 from sqlalchemy import create_engine, text
 from typing import Dict, Any, List
+from functools import lru_cache
 import logging
 
+# Optional: Arrow tracks nulls natively, so rows come out with None without a NaN-replacement pass
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def _load_connection_settings() -> Dict[str, str]:
+    """Read SQL Server settings from the environment and build both connection strings once"""
+    server = os.getenv('SQL_SERVER_HOST', 'localhost')
+    port = os.getenv('SQL_SERVER_PORT', '1433')
+    database = os.getenv('SQL_SERVER_DATABASE', 'RAGPrototipe')
+    username = os.getenv('SQL_SERVER_USERNAME', 'sa')
+    password = os.getenv('SQL_SERVER_PASSWORD', '')
+    driver = os.getenv('SQL_SERVER_DRIVER', 'ODBC Driver 17 for SQL Server')
+    
+    return {
+        "server": server,
+        "port": port,
+        "database": database,
+        "username": username,
+        "password": password,
+        "driver": driver,
+        # Connection string for pyodbc
+        "connection_string": (
+            f"DRIVER={{{driver}}};"
+            f"SERVER={server},{port};"
+            f"DATABASE={database};"
+            f"UID={username};"
+            f"PWD={password};"
+            f"TrustServerCertificate=yes;"
+        ),
+        # Connection string for SQLAlchemy
+        "sqlalchemy_url": (
+            f"mssql+pyodbc://{username}:{password}@"
+            f"{server}:{port}/{database}?"
+            f"driver={driver.replace(' ', '+')}&TrustServerCertificate=yes"
+        ),
+    }
+
+# SQL Server data types -> pyodbc parameter types for setinputsizes; other types are left to pyodbc to infer
+_SQL_PARAM_TYPES = {
+    'int': pyodbc.SQL_INTEGER,
+    'bigint': pyodbc.SQL_BIGINT,
+    'smallint': pyodbc.SQL_SMALLINT,
+    'tinyint': pyodbc.SQL_TINYINT,
+    'bit': pyodbc.SQL_BIT,
+    'float': pyodbc.SQL_DOUBLE,
+    'real': pyodbc.SQL_REAL,
+    'datetime': pyodbc.SQL_TYPE_TIMESTAMP,
+    'datetime2': pyodbc.SQL_TYPE_TIMESTAMP,
+    'nvarchar': pyodbc.SQL_WVARCHAR,
+    'nchar': pyodbc.SQL_WCHAR,
+    'varchar': pyodbc.SQL_VARCHAR,
+    'char': pyodbc.SQL_CHAR,
+}
+
+# Integer-valued SQL types; only declared when the DataFrame column is an integer dtype,
+# since float or object columns can still carry Python floats into them
+_INTEGER_SQL_TYPES = frozenset({'int', 'bigint', 'smallint', 'tinyint', 'bit'})
+
+# Character SQL types; only declared for columns that hold strings, since a number
+# or timestamp bound as text would be converted by the server on every row
+_CHAR_SQL_TYPES = frozenset({'nvarchar', 'nchar', 'varchar', 'char'})
+
+def _is_str_column(column: pd.Series) -> bool:
+    """True for string-dtype columns and object columns whose non-null values are all str"""
+    if pd.api.types.is_string_dtype(column.dtype) and column.dtype != object:
+        return True
+    return column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) in ('string', 'empty')
+
+@lru_cache(maxsize=32)
+def _build_insert(table_name: str, columns: tuple) -> str:
+    """Build the parameterized INSERT statement once per table/column layout"""
+    column_list = ", ".join(f"[{col}]" for col in columns)
+    placeholders = ", ".join("?" * len(columns))
+    return f"INSERT INTO [{table_name}] ({column_list}) VALUES ({placeholders})"
+
+def _iter_row_batches(df: pd.DataFrame, batch_size: int):
+    """Yield lists of at most batch_size row tuples with native Python values and None for missing data"""
+    if PYARROW_AVAILABLE:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, ValueError):
+            # Mixed-type or unsupported object values and duplicate column names
+            # cannot become an Arrow table; use the pandas path below
+            table = None
+        if table is not None:
+            for batch in table.to_batches(max_chunksize=batch_size):
+                yield list(zip(*(column.to_pylist() for column in batch.columns)))
+            return
+    
+    # pyodbc needs native Python values with None for missing data; one 2D object
+    # array gives both in a single pass, and each batch is sliced from it as row tuples
+    values = df.to_numpy(dtype=object, na_value=None)
+    for start in range(0, len(values), batch_size):
+        yield list(map(tuple, values[start:start + batch_size]))
+
 class SQLServerConnection:
     def __init__(self):
-        self.server = os.getenv('SQL_SERVER_HOST', 'localhost')
-        self.port = os.getenv('SQL_SERVER_PORT', '1433')
-        self.database = os.getenv('SQL_SERVER_DATABASE', 'RAGPrototipe')
-        self.username = os.getenv('SQL_SERVER_USERNAME', 'sa')
-        self.password = os.getenv('SQL_SERVER_PASSWORD', '')
-        self.driver = os.getenv('SQL_SERVER_DRIVER', 'ODBC Driver 17 for SQL Server')
+        settings = _load_connection_settings()
+        self.server = settings["server"]
+        self.port = settings["port"]
+        self.database = settings["database"]
+        self.username = settings["username"]
+        self.password = settings["password"]
+        self.driver = settings["driver"]
+        self.connection_string = settings["connection_string"]
+        self.sqlalchemy_url = settings["sqlalchemy_url"]
         
-        # Connection string for pyodbc
-        self.connection_string = (
-            f"DRIVER={{{self.driver}}};"
-            f"SERVER={self.server},{self.port};"
-            f"DATABASE={self.database};"
-            f"UID={self.username};"
-            f"PWD={self.password};"
-            f"TrustServerCertificate=yes;"
-        )
+        # Pooled SQLAlchemy engine, created on first use and reused afterwards
+        self._engine = None
         
-        # Connection string for SQLAlchemy
-        self.sqlalchemy_url = (
-            f"mssql+pyodbc://{self.username}:{self.password}@"
-            f"{self.server}:{self.port}/{self.database}?"
-            f"driver={self.driver.replace(' ', '+')}&TrustServerCertificate=yes"
-        )
+        # Column types per table, read once from INFORMATION_SCHEMA for parameter binding
+        self._column_types = {}
     
     def get_connection(self):
-        """Get pyodbc connection"""
+        """Get pyodbc connection (reused via the ODBC driver manager pool)"""
         try:
             conn = pyodbc.connect(self.connection_string)
             return conn
@@ -43,14 +135,28 @@ class SQLServerConnection:
             raise
     
     def get_engine(self):
-        """Get SQLAlchemy engine"""
+        """Get the shared, pooled SQLAlchemy engine"""
+        if self._engine is not None:
+            return self._engine
+        
         try:
-            engine = create_engine(self.sqlalchemy_url)
-            return engine
+            self._engine = create_engine(
+                self.sqlalchemy_url,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                fast_executemany=True
+            )
+            return self._engine
         except Exception as e:
             logger.error(f"Failed to create SQLAlchemy engine: {str(e)}")
             raise
     
+    @property
+    def engine(self):
+        """Shared SQLAlchemy engine"""
+        return self.get_engine()
+    
     def test_connection(self):
         """Test database connection"""
         try:
@@ -103,40 +209,87 @@ class SQLServerConnection:
             logger.error(f"Table truncation failed for {table_name}: {str(e)}")
             raise
 
-    def insert_dataframe_to_table(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append', batch_size: int = 50):
-        """Insert pandas DataFrame to SQL Server table using batch processing"""
+    def _get_input_sizes(self, cursor, table_name: str, df: pd.DataFrame) -> List:
+        """Build setinputsizes declarations for inserting columns into table_name (None = let pyodbc infer)"""
+        schema = self._column_types.get(table_name)
+        if schema is None:
+            try:
+                cursor.execute(
+                    "SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, DATETIME_PRECISION "
+                    "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ?",
+                    table_name
+                )
+                schema = {name: (data_type, length, precision) for name, data_type, length, precision in cursor.fetchall()}
+            except Exception as e:
+                logger.warning(f"Could not read column types for {table_name}: {str(e)}")
+                return []
+            self._column_types[table_name] = schema
+        
+        sizes = []
+        for col, column in df.items():
+            dtype = column.dtype
+            data_type, length, precision = schema.get(col, (None, None, None))
+            sql_type = _SQL_PARAM_TYPES.get(data_type)
+            if sql_type is None or (length is not None and length < 0):
+                # Unknown type or (n)varchar(max)
+                sizes.append(None)
+            elif data_type in _INTEGER_SQL_TYPES and not pd.api.types.is_integer_dtype(dtype):
+                # Float/object columns may hold Python floats; let pyodbc infer those
+                sizes.append(None)
+            elif data_type in _CHAR_SQL_TYPES and not _is_str_column(column):
+                # Non-string values (numbers, timestamps) are left to pyodbc
+                sizes.append(None)
+            elif data_type in ('datetime', 'datetime2'):
+                # Column size is the character length of the timestamp: 19, plus the dot and fraction digits
+                precision = precision or 0
+                sizes.append((sql_type, 20 + precision if precision else 19, precision))
+            else:
+                sizes.append((sql_type, length or 0, 0))
+        return sizes
+    
+    def insert_dataframe_to_table(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append', batch_size: int = 5000, truncate: bool = False):
+        """Insert pandas DataFrame to SQL Server table using pyodbc fast_executemany batches.
+        With truncate=True the table is emptied first, in the same transaction as the insert."""
         try:
-            if len(df) == 0:
+            if len(df) == 0 and not truncate:
                 return 0
             
-            engine = self.get_engine()
             total_rows = len(df)
             
-            # If DataFrame is small enough, insert directly
-            if total_rows <= batch_size:
-                df.to_sql(table_name, engine, if_exists=if_exists, index=False, method='multi')
-                print(f"✅ Inserted {total_rows} rows to {table_name}")
-                return total_rows
+            # Let pandas create/replace the (empty) table when not simply appending
+            if if_exists != 'append':
+                df.head(0).to_sql(table_name, self.get_engine(), if_exists=if_exists, index=False)
+                self._column_types.pop(table_name, None)
+            
+            insert_query = _build_insert(table_name, tuple(df.columns))
             
-            # Process in batches for large DataFrames
             total_inserted = 0
             batch_num = 1
             
-            for start_idx in range(0, total_rows, batch_size):
-                end_idx = min(start_idx + batch_size, total_rows)
-                batch_df = df.iloc[start_idx:end_idx].copy()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.fast_executemany = True
                 
-                print(f"📦 Processing batch {batch_num}: rows {start_idx+1}-{end_idx} ({len(batch_df)} rows)")
+                if truncate:
+                    print(f"🗑️  Truncating table: {table_name}")
+                    cursor.execute(f"TRUNCATE TABLE [{table_name}]")
                 
-                # For first batch, use the specified if_exists behavior
-                # For subsequent batches, always append
-                batch_if_exists = if_exists if start_idx == 0 else 'append'
+                # Declare parameter types from the table schema so the driver skips per-row type inference
+                input_sizes = self._get_input_sizes(cursor, table_name, df)
+                if any(size is not None for size in input_sizes):
+                    cursor.setinputsizes(input_sizes)
                 
-                batch_df.to_sql(table_name, engine, if_exists=batch_if_exists, index=False, method='multi')
-                total_inserted += len(batch_df)
-                batch_num += 1
+                # The same SQL text for every batch keeps the statement prepared on this cursor
+                for batch_rows in _iter_row_batches(df, batch_size):
+                    print(f"📦 Processing batch {batch_num}: rows {total_inserted+1}-{total_inserted+len(batch_rows)} ({len(batch_rows)} rows)")
+                    
+                    cursor.executemany(insert_query, batch_rows)
+                    total_inserted += len(batch_rows)
+                    batch_num += 1
                 
-                print(f"✅ Batch {batch_num-1} inserted successfully ({len(batch_df)} rows)")
+                # Single transaction for the whole DataFrame
+                conn.commit()
+                cursor.close()
             
             print(f"🎉 Total inserted: {total_inserted}/{total_rows} rows to {table_name}")
             return total_inserted
@@ -146,4 +299,8 @@ class SQLServerConnection:
             raise
 
 # Global instance
-sql_server = SQLServerConnection()
\ No newline at end of file
+sql_server = SQLServerConnection()
+logger.info(
+    f"SQL Server config ready: {sql_server.server}:{sql_server.port}/{sql_server.database} "
+    f"(driver: {sql_server.driver})"
+)
\ No newline at end of file
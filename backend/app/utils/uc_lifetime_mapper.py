@@ -3,6 +3,15 @@ Mapping untuk field UC_Life_Time table
 Membantu mapping kolom Excel ke field database UC_Life_Time untuk Expected Lifetime system
 """
 
+import logging
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
 # Mapping kolom Excel yang umum ke field database UC_Life_Time
 UC_LIFETIME_FIELD_MAPPING = {
     # Basic Information
@@ -60,221 +69,266 @@ UC_LIFETIME_FIELD_MAPPING = {
     'comp': 'Component',
 }
 
+# Actual column names from UC_Life_Time table (excluding ID as it's auto-increment), in table order
+_DB_COLUMNS = (
+    'Model',
+    'General_Sand',
+    'Soil',
+    'Marsh',
+    'Coal',
+    'Hard_Rock',
+    'Brittle_Rock',
+    'Pure_Sand_Middle_East',
+    'Component'
+)
+_DB_COLUMN_SET = frozenset(_DB_COLUMNS)
+
 def get_all_uc_lifetime_columns():
     """Return all actual column names from UC_Life_Time table (excluding ID as it's auto-increment)"""
-    columns = [
-        'Model',
-        'General_Sand',
-        'Soil',
-        'Marsh',
-        'Coal',
-        'Hard_Rock',
-        'Brittle_Rock',
-        'Pure_Sand_Middle_East',
-        'Component'
-    ]
-    return columns
+    return _DB_COLUMNS
+
+# Characters ignored when comparing Excel headers with database fields
+_STRIP_TABLE = str.maketrans('', '', ' _-[]')
+
+def _normalize_column_name(name):
+    """Normalize a column name for lookup: trim, lowercase and drop ' _-[]'"""
+    return name.strip().lower().translate(_STRIP_TABLE)
+
+# Normalized Excel header -> database field, built once from the mapping and the table columns
+_NORMALIZED_MAP = {_normalize_column_name(k): v for k, v in UC_LIFETIME_FIELD_MAPPING.items()}
+_NORMALIZED_MAP.update({_normalize_column_name(c): c for c in _DB_COLUMNS})
+
+def _resolve(clean_col):
+    """Resolve a cleaned Excel header to its database field via the normalized table, or None (shared by filter and mapper)"""
+    target = _NORMALIZED_MAP.get(_normalize_column_name(clean_col))
+    if target is None and '[' in clean_col:
+        # Fall back to the content of the last bracket, e.g. 'Hard Rock [HR]' -> 'hr'
+        target = _NORMALIZED_MAP.get(_normalize_column_name(clean_col.split('[')[-1]))
+    return target
+
+# Character trie over the mapping keys so one walk of a header finds every key it contains
+_TRIE_END = ''
+
+def _build_pattern_trie():
+    """Build a dict-of-dicts trie whose terminal nodes hold (order, pattern, db_field)"""
+    trie = {}
+    for order, (pattern, db_field) in enumerate(UC_LIFETIME_FIELD_MAPPING.items()):
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[_TRIE_END] = (order, pattern, db_field)
+    return trie
+
+_PATTERN_TRIE = _build_pattern_trie()
+
+def _iter_pattern_matches(text):
+    """Yield (order, pattern, db_field) for every mapping key found as a substring of text"""
+    for start in range(len(text)):
+        node = _PATTERN_TRIE
+        for index in range(start, len(text)):
+            node = node.get(text[index])
+            if node is None:
+                break
+            if _TRIE_END in node:
+                yield node[_TRIE_END]
+
+# Bracketed condition codes in complex headers, e.g. 'Hard Rock [HR]'
+_BRACKET_RE = re.compile(r'\[(s|so|m|c|hr|h|br|ps)\]', re.IGNORECASE)
+
+# Header tokens used to find the real header row below merged/empty Excel headers
+_HEADER_TOKENS = ('model', 'general_sand', 'soil', 'marsh', 'coal', 'hard_rock', 'brittle_rock', 'pure_sand', 'component')
+_HEADER_TOKEN_PATTERN = '|'.join(_HEADER_TOKENS)
 
 def filter_excel_columns_for_uc_lifetime(excel_df):
     """Filter Excel DataFrame to only include columns that exist in UC_Life_Time table"""
     db_columns = get_all_uc_lifetime_columns()
     
-    print(f"🔍 DEBUG: Excel columns found: {list(excel_df.columns)}")
-    print(f"🔍 DEBUG: Database columns expected: {db_columns}")
+    # Per-column outcomes are collected and logged once, only when DEBUG is enabled
+    debug = logger.isEnabledFor(logging.DEBUG)
+    details = []
+    
+    logger.debug("Excel columns found: %s", list(excel_df.columns))
+    logger.debug("Database columns expected: %s", db_columns)
+    
+    # Check if we need to find the real header row
+    if any("Unnamed:" in str(col) for col in excel_df.columns):
+        logger.info("⚠️ Detected 'Unnamed' columns - looking for real header row...")
+        # Score the first 5 rows at once: how many cells contain an expected header token
+        head = excel_df.head(5).astype(str)
+        cells = pd.Series(head.to_numpy().ravel(), dtype=object)
+        cell_hits = cells.str.contains(_HEADER_TOKEN_PATTERN, case=False, regex=True, na=False).to_numpy(dtype=bool)
+        header_matches = cell_hits.reshape(head.shape).sum(axis=1)
+        header_rows = np.flatnonzero(header_matches >= 5)
+        
+        if len(header_rows):  # If we find at least 5 matching headers
+            i = int(header_rows[0])
+            if debug:
+                details.append(f"✅ Found real headers at row {i}: {list(head.iloc[i].str.lower())}")
+            # Use this row as headers and skip previous rows
+            new_excel_df = excel_df.iloc[i+1:].copy()
+            new_excel_df.columns = excel_df.iloc[i].values
+            excel_df = new_excel_df
+            if debug:
+                details.append(f"🔄 Updated Excel columns: {list(excel_df.columns)}")
     
     # Strategy 1: Try normal column matching
     matching_columns = []
+    used_targets = set()
+    
+    # Clean column names for comparison once, every strategy below reuses them
+    cleaned = [str(col).strip() for col in excel_df.columns]
+    lowered = [clean_col.lower() for clean_col in cleaned]
     
-    for i, col in enumerate(excel_df.columns):
-        # Clean column name for comparison
-        clean_col = str(col).strip()
+    for col, clean_col, col_lower in zip(excel_df.columns, cleaned, lowered):
+        # Every database field is already covered, remaining columns can only be extras
+        if len(used_targets) == len(_DB_COLUMN_SET):
+            break
         
-        # Check if column exists in database (exact match)
-        if clean_col in db_columns:
+        # Single lookup in the precomputed normalized table
+        target = _resolve(clean_col)
+        if target is not None:
             matching_columns.append(col)
-            print(f"✅ Matched column: '{col}' -> '{clean_col}'")
+            used_targets.add(target)
+            if debug:
+                details.append(f"✅ Matched column: '{col}' -> '{target}'")
         else:
-            # Try various name variations
-            variations = [
-                clean_col.replace(' ', '_'),
-                clean_col.replace('-', '_'),
-                clean_col.replace(' ', ''),
-                clean_col.replace('_', ' '),
-                clean_col.title().replace(' ', '_'),
-                clean_col.upper(),
-                clean_col.lower(),
-                clean_col.replace('[', '').replace(']', '').lower(),  # Remove brackets
-                clean_col.split('[')[-1].replace(']', '').lower() if '[' in clean_col else None  # Extract content in brackets
-            ]
-            
-            # Remove None values
-            variations = [v for v in variations if v is not None]
-            
             found_match = False
-            for variant in variations:
-                if variant in db_columns:
-                    matching_columns.append(col)
-                    print(f"✅ Matched column (variant): '{col}' -> '{variant}'")
-                    found_match = True
-                    break
-                # Check in mapping dictionary
-                elif variant.lower() in UC_LIFETIME_FIELD_MAPPING:
-                    matching_columns.append(col)
-                    print(f"✅ Matched column (mapping): '{col}' -> '{UC_LIFETIME_FIELD_MAPPING[variant.lower()]}'")
-                    found_match = True
-                    break
             
             # Special handling untuk kolom header yang kompleks
+            # Check if column contains key patterns
+            bracket = _BRACKET_RE.search(col_lower)
+            if bracket:
+                # Map the bracketed code found in the header
+                pattern = f"[{bracket.group(1)}]"
+                db_field = UC_LIFETIME_FIELD_MAPPING[pattern]
+                matching_columns.append(col)
+                used_targets.add(db_field)
+                if debug:
+                    details.append(f"✅ Matched column (pattern): '{col}' -> '{db_field}' (pattern: {pattern})")
+                found_match = True
+            
             if not found_match:
-                # Check if column contains key patterns
-                col_lower = clean_col.lower()
-                if any(pattern in col_lower for pattern in ['[s]', '[so]', '[m]', '[c]', '[hr]', '[h]', '[br]', '[ps]']):
-                    # Extract the pattern and map it
-                    for pattern, db_field in UC_LIFETIME_FIELD_MAPPING.items():
-                        if pattern in col_lower:
-                            matching_columns.append(col)
-                            print(f"✅ Matched column (pattern): '{col}' -> '{db_field}' (pattern: {pattern})")
-                            found_match = True
-                            break
-                
-                if not found_match:
-                    print(f"❌ No match for column: '{col}'")
+                if debug:
+                    details.append(f"❌ No match for column: '{col}'")
     
     # Strategy 2: If we have very few matches, try positional mapping for common UC_Life_Time formats
     if len(matching_columns) <= 2 and len(excel_df.columns) >= 8:
-        print("🔄 Trying positional mapping strategy for UC_Life_Time...")
+        logger.info("🔄 Trying positional mapping strategy for UC_Life_Time...")
         # Common pattern: Model, General_Sand, Soil, Marsh, Coal, Hard_Rock, Brittle_Rock, Pure_Sand_Middle_East, Component
-        expected_order = ['Model', 'General_Sand', 'Soil', 'Marsh', 'Coal', 'Hard_Rock', 'Brittle_Rock', 'Pure_Sand_Middle_East', 'Component']
+        expected_order = _DB_COLUMNS
         matching_columns = []
         
         for i, col in enumerate(excel_df.columns):
             if i < len(expected_order):
                 # Skip if it looks like empty or merged header
-                col_str = str(col).strip()
+                col_str = cleaned[i]
                 if not col_str.startswith('Unnamed:') or i == 0:  # Always include first column (Model)
                     matching_columns.append(col)
-                    print(f"✅ Positional match: '{col}' -> '{expected_order[i]}' (position {i})")
+                    if debug:
+                        details.append(f"✅ Positional match: '{col}' -> '{expected_order[i]}' (position {i})")
                 else:
                     # Try next few columns to find non-empty content
                     sample_data = excel_df[col].dropna().astype(str).str.strip()
                     non_empty_data = sample_data[sample_data != ''].head(3)
                     if len(non_empty_data) > 0:
                         matching_columns.append(col)
-                        print(f"✅ Data-based match: '{col}' -> '{expected_order[i]}' (has data: {list(non_empty_data)})")
+                        if debug:
+                            details.append(f"✅ Data-based match: '{col}' -> '{expected_order[i]}' (has data: {list(non_empty_data)})")
     
-    print(f"Found {len(matching_columns)} matching columns out of {len(excel_df.columns)} Excel columns for UC_Life_Time")
-    print(f"Matching columns: {matching_columns}")
+    logger.info("Found %s matching columns out of %s Excel columns for UC_Life_Time", len(matching_columns), len(excel_df.columns))
+    logger.debug("Matching columns: %s", matching_columns)
+    
+    if details:
+        logger.debug("UC_Life_Time column filter:\n%s", "\n".join(details))
     
     # Return DataFrame with only matching columns
     return excel_df[matching_columns] if matching_columns else excel_df
 
 def map_excel_to_uc_lifetime_columns(excel_df):
     """Map Excel DataFrame columns to UC_Life_Time database column names"""
+    # Recurring uploads reuse the same template, so the mapping is cached per header tuple;
+    # logging stays out here so every upload reports how its headers were mapped
+    mapped_columns, positional, details = _map_columns_cached(tuple(excel_df.columns))
+    
+    if positional:
+        logger.info("🔄 Using positional mapping strategy...")
+    
+    if details and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("UC_Life_Time column mapping:\n%s", "\n".join(details))
+    
+    return dict(mapped_columns)
+
+def resolve_uc_lifetime_columns(excel_df):
+    """Filter and map an Excel DataFrame for UC_Life_Time in one call, returns (filtered_df, column_mapping)"""
+    filtered_df = filter_excel_columns_for_uc_lifetime(excel_df)
+    return filtered_df, map_excel_to_uc_lifetime_columns(filtered_df)
+
+@lru_cache(maxsize=256)
+def _map_columns_cached(excel_columns):
+    """Build the Excel -> UC_Life_Time column mapping for a tuple of Excel column names
+    
+    Pure function of the headers: returns (mapping, used_positional, details) and leaves
+    logging to the caller, so cached hits log the same way as the first call
+    """
     mapped_columns = {}
-    db_columns = get_all_uc_lifetime_columns()
+    
+    # Per-column outcomes, logged by the caller when DEBUG is enabled
+    details = []
+    
+    # Each database field is claimed by the first Excel column that maps to it
+    used_targets = set()
+    
+    def claim(col, db_field):
+        """Map col to db_field unless an earlier column already holds that field"""
+        if db_field in used_targets:
+            details.append(f"⚠️  Skipping duplicate mapping: '{col}' -> '{db_field}' (already mapped)")
+            return
+        mapped_columns[col] = db_field
+        used_targets.add(db_field)
     
     # Strategy 1: Try normal column matching
     normal_mapping_count = 0
     
+    # Clean column names once (remove spaces, convert to proper case, etc.)
+    cleaned = [str(col).strip() for col in excel_columns]
+    lowered = [clean_col.lower() for clean_col in cleaned]
+    
     # Convert Excel column names to match database fields
-    for col in excel_df.columns:
-        # Clean column name (remove spaces, convert to proper case, etc.)
-        clean_col = str(col).strip()
+    for col, clean_col, col_lower in zip(excel_columns, cleaned, lowered):
+        # Single lookup in the normalized table shared with the filter
+        target = _resolve(clean_col)
+        if target is not None:
+            claim(col, target)
+            details.append(f"🔗 Mapped via dictionary: '{col}' -> '{target}'")
+            normal_mapping_count += 1
+            continue
         
-        # Direct mapping if exists
-        if clean_col.lower() in UC_LIFETIME_FIELD_MAPPING:
-            mapped_columns[col] = UC_LIFETIME_FIELD_MAPPING[clean_col.lower()]
-            print(f"🔗 Mapped via dictionary: '{col}' -> '{UC_LIFETIME_FIELD_MAPPING[clean_col.lower()]}'")
+        # Special pattern matching untuk header yang kompleks
+        # Only match specific patterns, not single letters in middle of words
+        candidates = [
+            match for match in _iter_pattern_matches(col_lower)
+            if match[1].startswith('[') or  # Bracket patterns like [H], [M]
+            len(match[1]) > 1 or  # Multi-character patterns
+            col_lower == match[1]  # Single letter only if exact match
+        ]
+        if candidates:
+            # Keep the first pattern in mapping order
+            _, pattern, db_field = min(candidates)
+            claim(col, db_field)
+            details.append(f"🔗 Pattern match: '{col}' -> '{db_field}' (pattern: {pattern})")
             normal_mapping_count += 1
         else:
-            # Try exact match first
-            if clean_col in db_columns:
-                mapped_columns[col] = clean_col
-                print(f"🔗 Exact match: '{col}' -> '{clean_col}'")
-                normal_mapping_count += 1
-            else:
-                # Try various name variations
-                variations = [
-                    clean_col.replace(' ', '_'),
-                    clean_col.replace('-', '_'),
-                    clean_col.replace(' ', ''),
-                    clean_col.replace('_', ' '),
-                    clean_col.title().replace(' ', '_'),
-                    clean_col.upper(),
-                    clean_col.lower(),
-                    clean_col.replace('[', '').replace(']', '').lower(),  # Remove brackets
-                    clean_col.split('[')[-1].replace(']', '').lower() if '[' in clean_col else None  # Extract content in brackets
-                ]
-                
-                # Remove None values
-                variations = [v for v in variations if v is not None]
-                
-                found_match = False
-                for variant in variations:
-                    if variant in db_columns:
-                        mapped_columns[col] = variant
-                        print(f"🔗 Variant match: '{col}' -> '{variant}'")
-                        found_match = True
-                        normal_mapping_count += 1
-                        break
-                    elif variant.lower() in UC_LIFETIME_FIELD_MAPPING:
-                        mapped_columns[col] = UC_LIFETIME_FIELD_MAPPING[variant.lower()]
-                        print(f"🔗 Mapping match: '{col}' -> '{UC_LIFETIME_FIELD_MAPPING[variant.lower()]}'")
-                        found_match = True
-                        normal_mapping_count += 1
-                        break
-                
-                # Special pattern matching untuk header yang kompleks
-                if not found_match:
-                    col_lower = clean_col.lower()
-                    for pattern, db_field in UC_LIFETIME_FIELD_MAPPING.items():
-                        # Only match specific patterns, not single letters in middle of words
-                        if pattern in col_lower and (
-                            pattern.startswith('[') or  # Bracket patterns like [H], [M]
-                            len(pattern) > 1 or  # Multi-character patterns
-                            (len(pattern) == 1 and col_lower == pattern)  # Single letter only if exact match
-                        ):
-                            mapped_columns[col] = db_field
-                            print(f"🔗 Pattern match: '{col}' -> '{db_field}' (pattern: {pattern})")
-                            found_match = True
-                            normal_mapping_count += 1
-                            break
-                
-                if not found_match:
-                    # Try fuzzy matching based on common patterns
-                    col_lower = clean_col.lower().replace(' ', '').replace('_', '').replace('-', '').replace('[', '').replace(']', '')
-                    for db_field in db_columns:
-                        db_lower = db_field.lower().replace(' ', '').replace('_', '').replace('-', '')
-                        if col_lower == db_lower:
-                            mapped_columns[col] = db_field
-                            print(f"🔗 Fuzzy match: '{col}' -> '{db_field}'")
-                            found_match = True
-                            normal_mapping_count += 1
-                            break
-                
-                if not found_match:
-                    print(f"❌ Skipping column '{col}' - not found in UC_Life_Time table")
+            details.append(f"❌ Skipping column '{col}' - not found in UC_Life_Time table")
     
     # Strategy 2: If normal mapping failed, use positional mapping
-    if normal_mapping_count <= 2 and len(excel_df.columns) >= 8:
-        print("🔄 Using positional mapping strategy...")
+    positional = normal_mapping_count <= 2 and len(excel_columns) >= 8
+    if positional:
         mapped_columns = {}
-        expected_order = ['Model', 'General_Sand', 'Soil', 'Marsh', 'Coal', 'Hard_Rock', 'Brittle_Rock', 'Pure_Sand_Middle_East', 'Component']
+        expected_order = _DB_COLUMNS
         
-        for i, col in enumerate(excel_df.columns):
+        for i, col in enumerate(excel_columns):
             if i < len(expected_order):
                 mapped_columns[col] = expected_order[i]
-                print(f"🔗 Positional mapping: '{col}' -> '{expected_order[i]}' (position {i})")
-    
-    # Check for duplicate mappings and fix them
-    reverse_mapping = {}
-    for col, db_field in list(mapped_columns.items()):
-        if db_field in reverse_mapping:
-            print(f"⚠️  Duplicate mapping detected: '{col}' and '{reverse_mapping[db_field]}' both map to '{db_field}'")
-            # Remove the duplicate, keep the first one
-            del mapped_columns[col]
-            print(f"🗑️  Removed duplicate mapping: '{col}' -> '{db_field}'")
-        else:
-            reverse_mapping[db_field] = col
+                details.append(f"🔗 Positional mapping: '{col}' -> '{expected_order[i]}' (position {i})")
     
-    return mapped_columns
\ No newline at end of file
+    return mapped_columns, positional, tuple(details)
\ No newline at end of file
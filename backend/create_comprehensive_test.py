@@ -1,4 +1,4 @@
-import pandas as pd
+from openpyxl import Workbook
 
 # Create comprehensive test data with potential duplicate mappings
 data = {
@@ -41,20 +41,27 @@ data = {
     'Application Working': ['Loading', 'Excavation', 'Loading']
 }
 
-# Create DataFrame and save as Excel
-df = pd.DataFrame(data)
+# Write the sheet row by row - the upload endpoint expects .xlsx
+columns = list(data)
+rows = list(zip(*data.values()))
 test_file = 'test_comprehensive_upload.xlsx'
-df.to_excel(test_file, index=False)
+
+wb = Workbook(write_only=True)
+ws = wb.create_sheet('Sheet1')
+ws.append(columns)
+for row in rows:
+    ws.append(row)
+wb.save(test_file)
 
 print(f"✅ Created {test_file}")
-print(f"📊 Columns: {len(df.columns)}")  
-print(f"📊 Rows: {len(df)}")
-print(f"📊 Columns: {list(df.columns)}")
+print(f"📊 Columns: {len(columns)}")  
+print(f"📊 Rows: {len(rows)}")
+print(f"📊 Columns: {columns}")
 
 # Show potential duplicate mapping
 print(f"\n⚠️  Potential duplicate mapping:")
 print(f"   'Equipment Number' and 'Machine ID' both map to 'Equipment_Number'")
-print(f"   Values: {df[['Equipment Number', 'Machine ID']].to_dict('records')}")
+print(f"   Values: {[{'Equipment Number': e, 'Machine ID': m} for e, m in zip(data['Equipment Number'], data['Machine ID'])]}")
 
 print(f"\n💾 File saved as: {test_file}")
 print(f"📂 You can now upload this file via the web interface to test the fix")
\ No newline at end of file
@@ -6,6 +6,17 @@ def hash_password(password):
     """Hash password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
+def hash_password_many(passwords):
+    """Hash a batch of passwords using SHA-256, in input order"""
+    sha256 = hashlib.sha256
+    return [sha256(password.encode()).hexdigest() for password in passwords]
+
+# Users columns sent for each seeded user, in VALUES row order
+USER_IMPORT_COLUMNS = (
+    'Username', 'Email', 'Password_Hash', 'Full_Name', 'Role',
+    'Department', 'Phone', 'Employee_ID', 'Manager_ID'
+)
+
 def create_sample_users():
     """Create sample users in the database"""
     try:
@@ -90,63 +101,53 @@ def create_sample_users():
         for col in columns:
             print(f"  {col[0]} ({col[1]})")
         
-        # Insert or update users
-        for user in users:
-            # Check if user already exists
-            check_query = "SELECT ID FROM Users WHERE Username = ?"
-            cursor.execute(check_query, (user['username'],))
-            existing_user = cursor.fetchone()
-            
-            if existing_user:
-                # Update existing user
-                update_query = """
-                UPDATE Users SET 
-                    Email = ?,
-                    Password_Hash = ?,
-                    Full_Name = ?,
-                    Role = ?,
-                    Department = ?,
-                    Phone = ?,
-                    Employee_ID = ?,
-                    Manager_ID = ?,
-                    Is_Active = 1,
-                    Last_Updated_At = GETDATE(),
-                    Last_Updated_By = 'System'
-                WHERE Username = ?
-                """
-                cursor.execute(update_query, (
-                    user['email'],
-                    hash_password(user['password']),
-                    user['full_name'],
-                    user['role'],
-                    user['department'],
-                    user['phone'],
-                    user['employee_id'],
-                    user['manager_id'],
-                    user['username']
-                ))
-                print(f"Updated user: {user['username']}")
-            else:
-                # Insert new user
-                insert_query = """
-                INSERT INTO Users (
-                    Username, Email, Password_Hash, Full_Name, Role, Department,
-                    Is_Active, Created_At, Created_By, Last_Updated_At, Last_Updated_By,
-                    Phone, Employee_ID, Manager_ID, Login_Count
-                ) VALUES (?, ?, ?, ?, ?, ?, 1, GETDATE(), 'System', GETDATE(), 'System', ?, ?, ?, 0)
-                """
-                cursor.execute(insert_query, (
-                    user['username'],
-                    user['email'],
-                    hash_password(user['password']),
-                    user['full_name'],
-                    user['role'],
-                    user['department'],
-                    user['phone'],
-                    user['employee_id'],
-                    user['manager_id']
-                ))
-                print(f"Created user: {user['username']}")
+        password_hashes = hash_password_many(user['password'] for user in users)
+        rows = [
+            (
+                user['username'],
+                user['email'],
+                password_hash,
+                user['full_name'],
+                user['role'],
+                user['department'],
+                user['phone'],
+                user['employee_id'],
+                user['manager_id']
+            )
+            for user, password_hash in zip(users, password_hashes)
+        ]
+        
+        # All users go to the server as one parameterized MERGE batch; HOLDLOCK
+        # keeps two concurrent seeds from both inserting the same username
+        row_placeholders = ", ".join(["(" + ", ".join("?" * len(USER_IMPORT_COLUMNS)) + ")"] * len(rows))
+        upsert_query = f"""
+        MERGE Users WITH (HOLDLOCK) AS target
+        USING (VALUES {row_placeholders}) AS source ({", ".join(USER_IMPORT_COLUMNS)})
+        ON target.Username = source.Username
+        WHEN MATCHED THEN UPDATE SET
+            Email = source.Email,
+            Password_Hash = source.Password_Hash,
+            Full_Name = source.Full_Name,
+            Role = source.Role,
+            Department = source.Department,
+            Phone = source.Phone,
+            Employee_ID = source.Employee_ID,
+            Manager_ID = source.Manager_ID,
+            Is_Active = 1,
+            Last_Updated_At = GETDATE(),
+            Last_Updated_By = 'System'
+        WHEN NOT MATCHED THEN INSERT (
+            Username, Email, Password_Hash, Full_Name, Role, Department,
+            Is_Active, Created_At, Created_By, Last_Updated_At, Last_Updated_By,
+            Phone, Employee_ID, Manager_ID, Login_Count
+        ) VALUES (
+            source.Username, source.Email, source.Password_Hash, source.Full_Name, source.Role, source.Department,
+            1, GETDATE(), 'System', GETDATE(), 'System',
+            source.Phone, source.Employee_ID, source.Manager_ID, 0
+        );
+        """
+        cursor.execute(upsert_query, [value for row in rows for value in row])
+        print(f"Created/updated users: {', '.join(user['username'] for user in users)}")
         
         conn.commit()
         print("\nSample users created/updated successfully!")
@@ -10,8 +10,7 @@ def create_test_image():
     test_content = b"Mock image content for testing metadata functionality"
     
     test_file_path = Path("test_image.jpg")
-    with open(test_file_path, "wb") as f:
-        f.write(test_content)
+    test_file_path.write_bytes(test_content)
     
     print(f"Created test file: {test_file_path}")
     print(f"File size: {len(test_content)} bytes")
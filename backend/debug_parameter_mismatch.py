@@ -1,10 +1,17 @@
 import pandas as pd
 import sys
+import os
 import traceback
+import logging
 sys.path.append('/home/appuser/app')
 
 from app.utils.inspection_data_mapper import get_all_inspection_data_columns, get_mapped_columns
 
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+# Debug script: this script's dtype dumps are shown by default, set LOG_LEVEL=INFO to hide them
+log.setLevel(os.getenv("LOG_LEVEL", "DEBUG").upper())
+
 print("🔍 DEBUGGING PARAMETER MISMATCH")
 print("=" * 50)
 
@@ -20,7 +27,8 @@ try:
     df = pd.DataFrame(test_data)
     print(f"✅ Created test DataFrame: {df.shape}")
     print(f"   Columns: {list(df.columns)}")
-    print(f"   Data types: {df.dtypes.to_dict()}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Data types: %s", df.dtypes.to_dict())
     
     # Get mapping
     mapped = get_mapped_columns(df.columns)
@@ -34,20 +42,21 @@ try:
     db_cols = get_all_inspection_data_columns()
     print(f"✅ Database columns count: {len(db_cols)}")
     
-    # Filter columns (exclude ID)
-    available_columns = set(df_mapped.columns)
-    final_columns = [col for col in db_cols if col in available_columns and col != 'ID']
-    print(f"✅ Final columns: {final_columns}")
+    # Filter columns (exclude ID) with one index intersection, keeping database order
+    target_columns = pd.Index([col for col in db_cols if col != 'ID'])
+    final_columns = target_columns.intersection(df_mapped.columns, sort=False)
+    print(f"✅ Final columns: {list(final_columns)}")
     
     # Create final DataFrame
-    df_final = df_mapped[final_columns]
+    df_final = df_mapped.reindex(columns=final_columns)
     print(f"✅ Final DataFrame shape: {df_final.shape}")
     print(f"   Final columns: {list(df_final.columns)}")
-    print(f"   Final data types: {df_final.dtypes.to_dict()}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Final data types: %s", df_final.dtypes.to_dict())
     
     # Check first row values
     if len(df_final) > 0:
-        first_row = df_final.iloc[0]
+        first_row = df_final.head(1).to_dict(orient='records')[0]
         print(f"\n✅ First row values:")
         for col, val in first_row.items():
             print(f"   {col}: {val} ({type(val)})")
@@ -4,116 +4,146 @@ Membantu mapping kolom Excel ke field database yang sesuai
 Updated to match actual database schema (103 columns) - NO DUPLICATES
 """
 
+import sys
+
+import numpy as np
+
+# All columns of the InspectionData table, built once at import (interned for pointer-equal lookups)
+_ALL_COLS = tuple(map(sys.intern, (
+    'ID',
+    'Inspection_ID',
+    'Machine_Type',
+    'Model_Code',
+    'Serial_No',
+    'Inspected_By',
+    'Link_Type',
+    'Link_Spec',
+    'Bushing_Spec',
+    'Track_Roller_Spec',
+    'Equipment_Number',
+    'SMR',
+    'Delivery_Date',
+    'Inspection_Date',
+    'Branch_Name',
+    'Customer_Name',
+    'Job_Site',
+    'Attachments',
+    'Comments',
+    'WorkingHourPerDay',
+    'UnderfootConditions_Terrain',
+    'UnderfootConditions_Abrasive',
+    'UnderfootConditions_Moisture',
+    'UnderfootConditions_Packing',
+    'ApplicationCode_Major',
+    'ApplicationCode_Minor',
+    'Application_Ground',
+    'Application_Working',
+    'LinkPitch_Brand_LHS',
+    'LinkPitch_Brand_RHS',
+    'LinkPitch_History_SMR_LHS',
+    'LinkPitch_History_SMR_RHS',
+    'LinkPitch_History_Date_LHS',
+    'LinkPitch_History_Date_RHS',
+    'LinkPitch_History_Hours_LHS',
+    'LinkPitch_History_Hours_RHS',
+    'LinkPitch_PercentWorn_LHS',
+    'LinkPitch_PercentWorn_RHS',
+    'LinkPitch_ReplaceDate_LHS',
+    'LinkPitch_ReplaceDate_RHS',
+    'Bushings_Brand_LHS',
+    'Bushings_Brand_RHS',
+    'Bushings_History_SMR_LHS',
+    'Bushings_History_SMR_RHS',
+    'Bushings_History_Date_LHS',
+    'Bushings_History_Date_RHS',
+    'Bushings_History_Hours_LHS',
+    'Bushings_History_Hours_RHS',
+    'Bushings_PercentWorn_LHS',
+    'Bushings_PercentWorn_RHS',
+    'Bushings_ReplaceDate_LHS',
+    'Bushings_ReplaceDate_RHS',
+    'LinkHeight_Brand_LHS',
+    'LinkHeight_Brand_RHS',
+    'LinkHeight_History_SMR_LHS',
+    'LinkHeight_History_SMR_RHS',
+    'LinkHeight_History_Date_LHS',
+    'LinkHeight_History_Date_RHS',
+    'LinkHeight_History_Hours_LHS',
+    'LinkHeight_History_Hours_RHS',
+    'LinkHeight_PercentWorn_LHS',
+    'LinkHeight_PercentWorn_RHS',
+    'LinkHeight_ReplaceDate_LHS',
+    'LinkHeight_ReplaceDate_RHS',
+    'TrackShoe_Type',
+    'TrackShoe_Width',
+    'TrackShoe_Width_Type',
+    'TrackShoe_Brand_LHS',
+    'TrackShoe_Brand_RHS',
+    'TrackShoe_History_SMR_LHS',
+    'TrackShoe_History_SMR_RHS',
+    'TrackShoe_History_Date_LHS',
+    'TrackShoe_History_Date_RHS',
+    'TrackShoe_History_Hours_LHS',
+    'TrackShoe_History_Hours_RHS',
+    'TrackShoe_PercentWorn_LHS',
+    'TrackShoe_PercentWorn_RHS',
+    'TrackShoe_ReplaceDate_LHS',
+    'TrackShoe_ReplaceDate_RHS',
+    'Idlers_Brand_LHS1',
+    'Idlers_Brand_RHS1',
+    'Idlers_History_SMR_LHS1',
+    'Idlers_History_SMR_RHS1',
+    'Idlers_History_Date_LHS1',
+    'Idlers_History_Date_RHS1',
+    'Idlers_History_Hours_LHS1',
+    'Idlers_History_Hours_RHS1',
+    'Idlers_PercentWorn_LHS1',
+    'Idlers_PercentWorn_RHS1',
+    'Idlers_ReplaceDate_LHS1',
+    'Idlers_ReplaceDate_RHS1',
+    'Sprocket_Brand_LHS',
+    'Sprocket_Brand_RHS',
+    'Sprocket_History_SMR_LHS',
+    'Sprocket_History_SMR_RHS',
+    'Sprocket_History_Date_LHS',
+    'Sprocket_History_Date_RHS',
+    'Sprocket_History_Hours_LHS',
+    'Sprocket_History_Hours_RHS',
+    'Sprocket_PercentWorn_LHS',
+    'Sprocket_PercentWorn_RHS',
+    'Sprocket_ReplaceDate_LHS',
+    'Sprocket_ReplaceDate_RHS'
+)))
+
 def get_all_inspection_data_columns():
     """
     Returns list of all columns that exist in the InspectionData table.
     This matches the actual database schema exactly (103 columns).
     """
-    return [
-        'ID',
-        'Inspection_ID',
-        'Machine_Type',
-        'Model_Code',
-        'Serial_No',
-        'Inspected_By',
-        'Link_Type',
-        'Link_Spec',
-        'Bushing_Spec',
-        'Track_Roller_Spec',
-        'Equipment_Number',
-        'SMR',
-        'Delivery_Date',
-        'Inspection_Date',
-        'Branch_Name',
-        'Customer_Name',
-        'Job_Site',
-        'Attachments',
-        'Comments',
-        'WorkingHourPerDay',
-        'UnderfootConditions_Terrain',
-        'UnderfootConditions_Abrasive',
-        'UnderfootConditions_Moisture',
-        'UnderfootConditions_Packing',
-        'ApplicationCode_Major',
-        'ApplicationCode_Minor',
-        'Application_Ground',
-        'Application_Working',
-        'LinkPitch_Brand_LHS',
-        'LinkPitch_Brand_RHS',
-        'LinkPitch_History_SMR_LHS',
-        'LinkPitch_History_SMR_RHS',
-        'LinkPitch_History_Date_LHS',
-        'LinkPitch_History_Date_RHS',
-        'LinkPitch_History_Hours_LHS',
-        'LinkPitch_History_Hours_RHS',
-        'LinkPitch_PercentWorn_LHS',
-        'LinkPitch_PercentWorn_RHS',
-        'LinkPitch_ReplaceDate_LHS',
-        'LinkPitch_ReplaceDate_RHS',
-        'Bushings_Brand_LHS',
-        'Bushings_Brand_RHS',
-        'Bushings_History_SMR_LHS',
-        'Bushings_History_SMR_RHS',
-        'Bushings_History_Date_LHS',
-        'Bushings_History_Date_RHS',
-        'Bushings_History_Hours_LHS',
-        'Bushings_History_Hours_RHS',
-        'Bushings_PercentWorn_LHS',
-        'Bushings_PercentWorn_RHS',
-        'Bushings_ReplaceDate_LHS',
-        'Bushings_ReplaceDate_RHS',
-        'LinkHeight_Brand_LHS',
-        'LinkHeight_Brand_RHS',
-        'LinkHeight_History_SMR_LHS',
-        'LinkHeight_History_SMR_RHS',
-        'LinkHeight_History_Date_LHS',
-        'LinkHeight_History_Date_RHS',
-        'LinkHeight_History_Hours_LHS',
-        'LinkHeight_History_Hours_RHS',
-        'LinkHeight_PercentWorn_LHS',
-        'LinkHeight_PercentWorn_RHS',
-        'LinkHeight_ReplaceDate_LHS',
-        'LinkHeight_ReplaceDate_RHS',
-        'TrackShoe_Type',
-        'TrackShoe_Width',
-        'TrackShoe_Width_Type',
-        'TrackShoe_Brand_LHS',
-        'TrackShoe_Brand_RHS',
-        'TrackShoe_History_SMR_LHS',
-        'TrackShoe_History_SMR_RHS',
-        'TrackShoe_History_Date_LHS',
-        'TrackShoe_History_Date_RHS',
-        'TrackShoe_History_Hours_LHS',
-        'TrackShoe_History_Hours_RHS',
-        'TrackShoe_PercentWorn_LHS',
-        'TrackShoe_PercentWorn_RHS',
-        'TrackShoe_ReplaceDate_LHS',
-        'TrackShoe_ReplaceDate_RHS',
-        'Idlers_Brand_LHS1',
-        'Idlers_Brand_RHS1',
-        'Idlers_History_SMR_LHS1',
-        'Idlers_History_SMR_RHS1',
-        'Idlers_History_Date_LHS1',
-        'Idlers_History_Date_RHS1',
-        'Idlers_History_Hours_LHS1',
-        'Idlers_History_Hours_RHS1',
-        'Idlers_PercentWorn_LHS1',
-        'Idlers_PercentWorn_RHS1',
-        'Idlers_ReplaceDate_LHS1',
-        'Idlers_ReplaceDate_RHS1',
-        'Sprocket_Brand_LHS',
-        'Sprocket_Brand_RHS',
-        'Sprocket_History_SMR_LHS',
-        'Sprocket_History_SMR_RHS',
-        'Sprocket_History_Date_LHS',
-        'Sprocket_History_Date_RHS',
-        'Sprocket_History_Hours_LHS',
-        'Sprocket_History_Hours_RHS',
-        'Sprocket_PercentWorn_LHS',
-        'Sprocket_PercentWorn_RHS',
-        'Sprocket_ReplaceDate_LHS',
-        'Sprocket_ReplaceDate_RHS'
-    ]
+    return list(_ALL_COLS)
+
+# Value kind of each database column, classified once from the schema names
+_DATE_COLS = frozenset(col for col in _ALL_COLS if 'Date' in col)
+_INT_COLS = frozenset(col for col in _ALL_COLS if 'SMR' in col or 'Hours' in col)
+_FLOAT_COLS = frozenset(col for col in _ALL_COLS if 'PercentWorn' in col)
+
+def classify(col):
+    """
+    Returns the value kind of a database column.
+    
+    Args:
+        col: Database column name
+        
+    Returns:
+        str: 'date', 'int', 'float' or 'str'
+    """
+    if col in _DATE_COLS:
+        return 'date'
+    if col in _INT_COLS:
+        return 'int'
+    if col in _FLOAT_COLS:
+        return 'float'
+    return 'str'
 
 # Mapping kolom Excel ke field database InspectionData
 # CLEANED: No duplicates to prevent SQL parameter issues
@@ -155,100 +185,51 @@ INSPECTION_DATA_FIELD_MAPPING = {
     'Application Ground': 'Application_Ground',
     'Application Working': 'Application_Working',
     
-    # Link Pitch fields - LHS (Left Hand Side)
-    'Link Pitch Brand LHS': 'LinkPitch_Brand_LHS',
-    'Link Pitch History SMR LHS': 'LinkPitch_History_SMR_LHS',
-    'Link Pitch History Date LHS': 'LinkPitch_History_Date_LHS',
-    'Link Pitch History Hours LHS': 'LinkPitch_History_Hours_LHS',
-    'Link Pitch Percent Worn LHS': 'LinkPitch_PercentWorn_LHS',
-    'Link Pitch Replace Date LHS': 'LinkPitch_ReplaceDate_LHS',
-    
-    # Link Pitch fields - RHS (Right Hand Side)
-    'Link Pitch Brand RHS': 'LinkPitch_Brand_RHS',
-    'Link Pitch History SMR RHS': 'LinkPitch_History_SMR_RHS',
-    'Link Pitch History Date RHS': 'LinkPitch_History_Date_RHS',
-    'Link Pitch History Hours RHS': 'LinkPitch_History_Hours_RHS',
-    'Link Pitch Percent Worn RHS': 'LinkPitch_PercentWorn_RHS',
-    'Link Pitch Replace Date RHS': 'LinkPitch_ReplaceDate_RHS',
-    
-    # Bushings fields - LHS
-    'Bushings Brand LHS': 'Bushings_Brand_LHS',
-    'Bushings History SMR LHS': 'Bushings_History_SMR_LHS',
-    'Bushings History Date LHS': 'Bushings_History_Date_LHS',
-    'Bushings History Hours LHS': 'Bushings_History_Hours_LHS',
-    'Bushings Percent Worn LHS': 'Bushings_PercentWorn_LHS',
-    'Bushings Replace Date LHS': 'Bushings_ReplaceDate_LHS',
-    
-    # Bushings fields - RHS
-    'Bushings Brand RHS': 'Bushings_Brand_RHS',
-    'Bushings History SMR RHS': 'Bushings_History_SMR_RHS',
-    'Bushings History Date RHS': 'Bushings_History_Date_RHS',
-    'Bushings History Hours RHS': 'Bushings_History_Hours_RHS',
-    'Bushings Percent Worn RHS': 'Bushings_PercentWorn_RHS',
-    'Bushings Replace Date RHS': 'Bushings_ReplaceDate_RHS',
-    
-    # Link Height fields - LHS
-    'Link Height Brand LHS': 'LinkHeight_Brand_LHS',
-    'Link Height History SMR LHS': 'LinkHeight_History_SMR_LHS',
-    'Link Height History Date LHS': 'LinkHeight_History_Date_LHS',
-    'Link Height History Hours LHS': 'LinkHeight_History_Hours_LHS',
-    'Link Height Percent Worn LHS': 'LinkHeight_PercentWorn_LHS',
-    'Link Height Replace Date LHS': 'LinkHeight_ReplaceDate_LHS',
-    
-    # Link Height fields - RHS
-    'Link Height Brand RHS': 'LinkHeight_Brand_RHS',
-    'Link Height History SMR RHS': 'LinkHeight_History_SMR_RHS',
-    'Link Height History Date RHS': 'LinkHeight_History_Date_RHS',
-    'Link Height History Hours RHS': 'LinkHeight_History_Hours_RHS',
-    'Link Height Percent Worn RHS': 'LinkHeight_PercentWorn_RHS',
-    'Link Height Replace Date RHS': 'LinkHeight_ReplaceDate_RHS',
-    
-    # Track Shoe fields
+    # Track Shoe fields that are not per side
     'Track Shoe Type': 'TrackShoe_Type',
     'Track Shoe Width': 'TrackShoe_Width',
     'Track Shoe Width Type': 'TrackShoe_Width_Type',
-    'Track Shoe Brand LHS': 'TrackShoe_Brand_LHS',
-    'Track Shoe Brand RHS': 'TrackShoe_Brand_RHS',
-    'Track Shoe History SMR LHS': 'TrackShoe_History_SMR_LHS',
-    'Track Shoe History SMR RHS': 'TrackShoe_History_SMR_RHS',
-    'Track Shoe History Date LHS': 'TrackShoe_History_Date_LHS',
-    'Track Shoe History Date RHS': 'TrackShoe_History_Date_RHS',
-    'Track Shoe History Hours LHS': 'TrackShoe_History_Hours_LHS',
-    'Track Shoe History Hours RHS': 'TrackShoe_History_Hours_RHS',
-    'Track Shoe Percent Worn LHS': 'TrackShoe_PercentWorn_LHS',
-    'Track Shoe Percent Worn RHS': 'TrackShoe_PercentWorn_RHS',
-    'Track Shoe Replace Date LHS': 'TrackShoe_ReplaceDate_LHS',
-    'Track Shoe Replace Date RHS': 'TrackShoe_ReplaceDate_RHS',
-    
-    # Idlers fields - LHS1/RHS1
-    'Idlers Brand LHS1': 'Idlers_Brand_LHS1',
-    'Idlers Brand RHS1': 'Idlers_Brand_RHS1',
-    'Idlers History SMR LHS1': 'Idlers_History_SMR_LHS1',
-    'Idlers History SMR RHS1': 'Idlers_History_SMR_RHS1',
-    'Idlers History Date LHS1': 'Idlers_History_Date_LHS1',
-    'Idlers History Date RHS1': 'Idlers_History_Date_RHS1',
-    'Idlers History Hours LHS1': 'Idlers_History_Hours_LHS1',
-    'Idlers History Hours RHS1': 'Idlers_History_Hours_RHS1',
-    'Idlers Percent Worn LHS1': 'Idlers_PercentWorn_LHS1',
-    'Idlers Percent Worn RHS1': 'Idlers_PercentWorn_RHS1',
-    'Idlers Replace Date LHS1': 'Idlers_ReplaceDate_LHS1',
-    'Idlers Replace Date RHS1': 'Idlers_ReplaceDate_RHS1',
-    
-    # Sprocket fields
-    'Sprocket Brand LHS': 'Sprocket_Brand_LHS',
-    'Sprocket Brand RHS': 'Sprocket_Brand_RHS',
-    'Sprocket History SMR LHS': 'Sprocket_History_SMR_LHS',
-    'Sprocket History SMR RHS': 'Sprocket_History_SMR_RHS',
-    'Sprocket History Date LHS': 'Sprocket_History_Date_LHS',
-    'Sprocket History Date RHS': 'Sprocket_History_Date_RHS',
-    'Sprocket History Hours LHS': 'Sprocket_History_Hours_LHS',
-    'Sprocket History Hours RHS': 'Sprocket_History_Hours_RHS',
-    'Sprocket Percent Worn LHS': 'Sprocket_PercentWorn_LHS',
-    'Sprocket Percent Worn RHS': 'Sprocket_PercentWorn_RHS',
-    'Sprocket Replace Date LHS': 'Sprocket_ReplaceDate_LHS',
-    'Sprocket Replace Date RHS': 'Sprocket_ReplaceDate_RHS',
 }
 
+# Undercarriage component fields follow one pattern:
+# '<Component> <Attribute> <Side>' -> '<Component>_<Attribute>_<Side>' (Idlers use side suffix '1')
+_COMPONENTS = (
+    ('LinkPitch', 'Link Pitch', ''),
+    ('Bushings', 'Bushings', ''),
+    ('LinkHeight', 'Link Height', ''),
+    ('TrackShoe', 'Track Shoe', ''),
+    ('Idlers', 'Idlers', '1'),
+    ('Sprocket', 'Sprocket', ''),
+)
+_COMPONENT_ATTRIBUTES = (
+    ('Brand', 'Brand'),
+    ('History_SMR', 'History SMR'),
+    ('History_Date', 'History Date'),
+    ('History_Hours', 'History Hours'),
+    ('PercentWorn', 'Percent Worn'),
+    ('ReplaceDate', 'Replace Date'),
+)
+
+def _component_field_mapping():
+    """Generate the Excel -> database mapping for every component/attribute/side combination"""
+    mapping = {}
+    for db_component, excel_component, suffix in _COMPONENTS:
+        for side in ('LHS', 'RHS'):
+            for db_attribute, excel_attribute in _COMPONENT_ATTRIBUTES:
+                mapping[f'{excel_component} {excel_attribute} {side}{suffix}'] = f'{db_component}_{db_attribute}_{side}{suffix}'
+    return mapping
+
+INSPECTION_DATA_FIELD_MAPPING.update(_component_field_mapping())
+
+# Intern every key and value so lookups against interned column names compare by identity
+INSPECTION_DATA_FIELD_MAPPING = {sys.intern(k): sys.intern(v) for k, v in INSPECTION_DATA_FIELD_MAPPING.items()}
+
+# Column names as fixed-width numpy string arrays for vectorized membership tests
+_ALL_COLS_ARR = np.array(_ALL_COLS)
+_ALL_COLS_SET = frozenset(_ALL_COLS)
+_EXCEL_NAMES = np.array(list(INSPECTION_DATA_FIELD_MAPPING.keys()))
+_DB_NAMES = np.array(list(INSPECTION_DATA_FIELD_MAPPING.values()))
+
 
 def get_mapped_columns(excel_columns):
     """
@@ -261,12 +242,10 @@ def get_mapped_columns(excel_columns):
     Returns:
         dict: {excel_column: database_field} for mapped columns only
     """
-    mapped = {}
-    for excel_col in excel_columns:
-        if excel_col in INSPECTION_DATA_FIELD_MAPPING:
-            db_field = INSPECTION_DATA_FIELD_MAPPING[excel_col]
-            mapped[excel_col] = db_field
-    return mapped
+    # Intersect the mapping's key view with the header set in C, then walk the headers
+    # in their original order so the result is deterministic
+    common = INSPECTION_DATA_FIELD_MAPPING.keys() & set(excel_columns)
+    return {excel_col: INSPECTION_DATA_FIELD_MAPPING[excel_col] for excel_col in excel_columns if excel_col in common}
 
 
 def get_missing_columns(excel_columns, required_columns=None):
@@ -282,21 +261,15 @@ def get_missing_columns(excel_columns, required_columns=None):
         list: Missing column names
     """
     if required_columns is None:
-        required_columns = get_all_inspection_data_columns()
+        required = _ALL_COLS_ARR
+    else:
+        required = np.array(list(required_columns), dtype=str)
     
     # Get mapped database fields from Excel columns
-    mapped_db_fields = set()
-    for excel_col in excel_columns:
-        if excel_col in INSPECTION_DATA_FIELD_MAPPING:
-            mapped_db_fields.add(INSPECTION_DATA_FIELD_MAPPING[excel_col])
-    
-    # Find missing required columns
-    missing = []
-    for req_col in required_columns:
-        if req_col not in mapped_db_fields:
-            missing.append(req_col)
+    mapped_db_fields = _DB_NAMES[np.isin(_EXCEL_NAMES, np.array(list(excel_columns), dtype=str))]
     
-    return missing
+    # Find missing required columns, keeping their order
+    return required[~np.isin(required, mapped_db_fields)].tolist()
 
 
 def is_inspection_data_complete(excel_columns):
@@ -309,6 +282,11 @@ def is_inspection_data_complete(excel_columns):
     Returns:
         tuple: (is_complete: bool, missing_columns: list)
     """
+    # Fast path: set containment, only build the missing list when something is absent
+    mapped_db_fields = {INSPECTION_DATA_FIELD_MAPPING[col] for col in excel_columns if col in INSPECTION_DATA_FIELD_MAPPING}
+    if _ALL_COLS_SET.issubset(mapped_db_fields):
+        return True, []
+    
     missing = get_missing_columns(excel_columns)
     return len(missing) == 0, missing
 
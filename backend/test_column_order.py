@@ -3,6 +3,7 @@ import sys
 sys.path.append('/home/appuser/app')
 
 from app.utils.inspection_data_mapper import get_all_inspection_data_columns
+from inspection_data_mapper_clean import classify
 
 print("🧪 TESTING COLUMN ORDER FIX")
 print("=" * 40)
@@ -35,11 +36,10 @@ for col in db_columns:
         test_data[col] = [68.94]
     else:
         # Default values for other columns
-        if 'Date' in col:
-            test_data[col] = [None]
-        elif 'SMR' in col or 'Hours' in col:
+        kind = classify(col)
+        if kind == 'int':
             test_data[col] = [0]
-        elif 'PercentWorn' in col:
+        elif kind == 'float':
             test_data[col] = [0.0]
         else:
             test_data[col] = [None]
@@ -9,6 +9,17 @@ import numpy as np
 from app.utils.inspection_data_mapper import get_mapped_columns, get_all_inspection_data_columns
 from app.utils.sql_server_connection import sql_server
 
+# Optional: when pyarrow is installed the insert layer builds rows through Arrow;
+# route those buffers through jemalloc, which copes better with large frames
+try:
+    import pyarrow as pa
+    pa.set_memory_pool(pa.jemalloc_memory_pool())
+except (ImportError, NotImplementedError):
+    pass
+
+# Insertable InspectionData columns in database order (ID is auto-increment)
+DB_COLUMNS_WITHOUT_ID = tuple(col for col in get_all_inspection_data_columns() if col != 'ID')
+
 def create_test_data_with_nulls():
     """Create test data with various NULL scenarios"""
     
@@ -53,19 +64,17 @@ def test_null_handling_comprehensive():
     
     # Check initial NULL counts
     print("\n📈 Initial NULL counts:")
-    for col in df.columns:
-        null_count = df[col].isna().sum()
-        if null_count > 0:
-            print(f"  {col}: {null_count} NULLs")
+    null_counts = df.isna().sum()
+    for col, null_count in null_counts[null_counts > 0].items():
+        print(f"  {col}: {null_count} NULLs")
     
     # Step 1: Map columns
     mapped = get_mapped_columns(df.columns.tolist())
     print(f"\n✅ Mapped {len(mapped)} out of {len(df.columns)} columns")
     
     # Step 2: Get all database columns and filter
-    all_db_columns = get_all_inspection_data_columns()
-    available_columns = set(df.columns)
-    final_columns = [col for col in all_db_columns if col in available_columns and col != 'ID']
+    available_columns = frozenset(df.columns)
+    final_columns = [col for col in DB_COLUMNS_WITHOUT_ID if col in available_columns]
     df_final = df[final_columns].copy()
     
     print(f"\n📊 Final DataFrame for database: {df_final.shape}")
@@ -74,97 +83,58 @@ def test_null_handling_comprehensive():
     # Step 3: Convert data types
     print("\n🔄 Converting data types...")
     
-    # Integer columns
-    int_columns = ['Inspection_ID', 'SMR']
-    for col in int_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce').astype('Int64')
-            print(f"  ✅ Converted {col} to Int64")
-    
-    # Date columns
-    date_columns = ['Delivery_Date', 'Inspection_Date', 'Sprocket_ReplaceDate_LHS', 'Sprocket_ReplaceDate_RHS']
-    for col in date_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_datetime(df_final[col], errors='coerce')
-            print(f"  ✅ Converted {col} to datetime")
-    
-    # Decimal columns
-    decimal_columns = ['WorkingHourPerDay', 'Sprocket_PercentWorn_LHS', 'Sprocket_PercentWorn_RHS']
-    for col in decimal_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-            print(f"  ✅ Converted {col} to float")
-    
-    # Step 4: Handle NULL values for pyodbc
+    # Target dtypes per schema column, converted in one batched pass per kind
+    int_columns = [col for col in ['Inspection_ID', 'SMR'] if col in df_final.columns]
+    date_columns = [col for col in ['Delivery_Date', 'Inspection_Date', 'Sprocket_ReplaceDate_LHS', 'Sprocket_ReplaceDate_RHS'] if col in df_final.columns]
+    decimal_columns = [col for col in ['WorkingHourPerDay', 'Sprocket_PercentWorn_LHS', 'Sprocket_PercentWorn_RHS'] if col in df_final.columns]
+    
+    numeric_columns = int_columns + decimal_columns
+    if numeric_columns:
+        df_final[numeric_columns] = df_final[numeric_columns].apply(pd.to_numeric, errors='coerce')
+    if date_columns:
+        df_final[date_columns] = df_final[date_columns].apply(pd.to_datetime, errors='coerce')
+    df_final = df_final.astype(dict.fromkeys(int_columns, 'Int64'))
+    
+    print(f"  ✅ Converted {int_columns} to Int64")
+    print(f"  ✅ Converted {date_columns} to datetime")
+    print(f"  ✅ Converted {decimal_columns} to float")
+    
+    # Step 4: Build pyodbc parameter rows in one pass - NaN, NaT and <NA> all become None
     print("\n🧹 Cleaning NULL values for pyodbc compatibility...")
     
-    for col in df_final.columns:
-        # Handle datetime columns - replace NaT with None
-        if df_final[col].dtype == 'datetime64[ns]':
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-            
-        # Handle nullable integer columns - replace <NA> with None
-        elif str(df_final[col].dtype).startswith('Int'):
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-            
-        # Handle float columns - replace NaN with None
-        elif df_final[col].dtype in ['float64', 'float32']:
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-            
-        # Handle object columns - replace NaN with None
-        elif df_final[col].dtype == 'object':
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-    
-    # Convert numpy types to native Python types
-    print("\n🔧 Converting numpy types to native Python types...")
-    
-    for col in df_final.columns:
-        if str(df_final[col].dtype).startswith('Int'):
-            df_final[col] = df_final[col].apply(lambda x: int(x) if pd.notna(x) and x is not None else None)
-        elif df_final[col].dtype in ['float64', 'float32']:
-            df_final[col] = df_final[col].apply(lambda x: float(x) if pd.notna(x) and x is not None else None)
+    # Null mask from the typed columns (vectorized per dtype block), not a scan of boxed objects
+    values = df_final.to_numpy(dtype=object)
+    values[df_final.isna().to_numpy()] = None
+    records = [tuple(row) for row in values]
     
     print("✅ NULL value handling completed")
     
     # Step 5: Check final data types and sample
     print("\n📊 Final data types and sample values:")
-    for col in df_final.columns[:10]:  # Show first 10 columns
-        sample_val = df_final[col].iloc[0]
+    for col, sample_val in list(zip(df_final.columns, records[0]))[:10]:  # Show first 10 columns
         print(f"  {col}: {type(sample_val)} = {repr(sample_val)}")
     
     # Step 6: Test database insert
     print(f"\n💾 Testing database insert with {len(df_final)} rows...")
     try:
-        # Test connection first
-        if sql_server.test_connection():
-            print("✅ Database connection successful")
-            
-            # Truncate test - use a safe approach
-            print("🗑️ Truncating InspectionData table...")
-            sql_server.truncate_table('InspectionData')
-            print("✅ Table truncated")
-            
-            # Insert data
-            records_inserted = sql_server.insert_dataframe_to_table(
-                df_final, 
-                'InspectionData',
-                if_exists='append'
-            )
-            
-            print(f"🎉 SUCCESS! Inserted {records_inserted} records with NULL values")
-            
-        else:
-            print("❌ Database connection failed")
-            
+        # Truncate and insert in one connection/transaction; a connection failure raises below
+        # (the insert layer applies the same object/None conversion)
+        records_inserted = sql_server.insert_dataframe_to_table(
+            df_final, 
+            'InspectionData',
+            if_exists='append',
+            truncate=True
+        )
+        
+        print(f"🎉 SUCCESS! Inserted {records_inserted} records with NULL values")
+        
     except Exception as e:
         print(f"❌ Database operation failed: {e}")
         print(f"Error type: {type(e)}")
         
         # Show first row parameters for debugging
         print(f"\n🔍 First row parameters for debugging:")
-        first_row = df_final.iloc[0]
-        params = tuple(first_row.values)
-        for i, param in enumerate(params):
+        for i, param in enumerate(records[0]):
             print(f"  [{i}] {type(param)} = {repr(param)}")
 
 if __name__ == "__main__":
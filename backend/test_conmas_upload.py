@@ -6,6 +6,13 @@ import requests
 import json
 from pathlib import Path
 
+# Optional: stream the multipart body instead of buffering the whole PDF in memory
+try:
+    from requests_toolbelt import MultipartEncoder
+    STREAMING_UPLOAD_AVAILABLE = True
+except ImportError:
+    STREAMING_UPLOAD_AVAILABLE = False
+
 # API endpoint
 API_BASE_URL = "http://localhost:8000"
 UPLOAD_ENDPOINT = f"{API_BASE_URL}/api/process-pdf-embeddings"
@@ -13,6 +20,9 @@ UPLOAD_ENDPOINT = f"{API_BASE_URL}/api/process-pdf-embeddings"
 # Path to the PDF file
 PDF_PATH = Path("CONMAS.pdf")
 
+# One pooled keep-alive session shared by the upload, index-info and list requests
+session = requests.Session()
+
 def test_pdf_upload():
     """Test uploading CONMAS.pdf to the API."""
     
@@ -29,7 +39,11 @@ def test_pdf_upload():
             files = {'file': (PDF_PATH.name, pdf_file, 'application/pdf')}
             
             print("⏳ Uploading PDF...")
-            response = requests.post(UPLOAD_ENDPOINT, files=files, timeout=300)  # 5 minute timeout
+            if STREAMING_UPLOAD_AVAILABLE:
+                encoder = MultipartEncoder(fields=files)
+                response = session.post(UPLOAD_ENDPOINT, data=encoder, headers={'Content-Type': encoder.content_type}, timeout=300)  # 5 minute timeout
+            else:
+                response = session.post(UPLOAD_ENDPOINT, files=files, timeout=300)  # 5 minute timeout
         
         print(f"📊 Response Status: {response.status_code}")
         
@@ -87,7 +101,7 @@ def test_faiss_index_info():
     
     try:
         print(f"\n🔍 Getting FAISS index info from {info_endpoint}")
-        response = requests.get(info_endpoint)
+        response = session.get(info_endpoint)
         
         if response.status_code == 200:
             result = response.json()
@@ -107,7 +121,7 @@ def test_processed_pdfs_list():
     
     try:
         print(f"\n📋 Getting processed PDFs list from {list_endpoint}")
-        response = requests.get(list_endpoint)
+        response = session.get(list_endpoint)
         
         if response.status_code == 200:
             result = response.json()
@@ -6,14 +6,14 @@ This tests the core normalization logic.
 
 import json
 
+import numpy as np
+
 def normalize_detection_response(api_response):
     """
     Normalize Azure Computer Vision API response to the expected format.
     (Simplified version without logging for testing)
     """
     try:
-        boxes = []
-        
         # Get image dimensions for normalization
         metadata = api_response.get("metadata", {})
         img_width = metadata.get("width", 1)
@@ -21,18 +21,22 @@ def normalize_detection_response(api_response):
         
         # Extract objects from the API response
         objects = api_response.get("objects", [])
+        if not objects:
+            return {"boxes": []}
         
-        for obj in objects:
-            # Extract bounding box rectangle
-            rect = obj.get("rectangle", {})
-            
-            # Normalize coordinates to 0-1 range
-            x = rect.get("x", 0) / img_width
-            y = rect.get("y", 0) / img_height
-            w = rect.get("w", 0) / img_width
-            h = rect.get("h", 0) / img_height
-            
-            box = {
+        # Normalize all bounding boxes to 0-1 range in one array operation;
+        # a zero image dimension raises like the scalar division did
+        rects = np.array([
+            [rect.get("x", 0), rect.get("y", 0), rect.get("w", 0), rect.get("h", 0)]
+            for rect in (obj.get("rectangle", {}) for obj in objects)
+        ], dtype=float)
+        scale = np.array([img_width, img_height, img_width, img_height], dtype=float)
+        with np.errstate(divide='raise', invalid='raise'):
+            xs, ys, ws, hs = (rects / scale).T.tolist()
+        
+        # Round with Python's round() so values match the per-box implementation exactly
+        boxes = [
+            {
                 "label": obj.get("object", "unknown"),
                 "x": round(x, 4),
                 "y": round(y, 4),
@@ -40,8 +44,8 @@ def normalize_detection_response(api_response):
                 "h": round(h, 4),
                 "score": round(obj.get("confidence", 0.0), 4)
             }
-            
-            boxes.append(box)
+            for obj, x, y, w, h in zip(objects, xs, ys, ws, hs)
+        ]
         
         return {"boxes": boxes}
         
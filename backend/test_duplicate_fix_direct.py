@@ -34,22 +34,20 @@ print(f"\nMapped columns ({len(mapped)}):")
 for excel_col, db_col in mapped.items():
     print(f"  {excel_col} -> {db_col}")
 
-# Rename columns
-df_mapped = df.rename(columns=mapped)
-print(f"\nAfter rename - Columns: {list(df_mapped.columns)}")
-
-# Check for duplicates
-duplicate_cols = df_mapped.columns[df_mapped.columns.duplicated()].tolist()
-if duplicate_cols:
-    print(f"⚠️  Found duplicate columns: {duplicate_cols}")
-    print("Original shape:", df_mapped.shape)
-    
-    # Remove duplicates (keep first occurrence)
-    df_mapped = df_mapped.loc[:, ~df_mapped.columns.duplicated()]
-    print(f"✅ After removing duplicates - Shape: {df_mapped.shape}")
-    print(f"✅ After removing duplicates - Columns: {list(df_mapped.columns)}")
-else:
-    print("✅ No duplicates found")
+# 'Equipment Number' and 'Machine ID' both map to Equipment_Number; the mapper
+# keeps only the first, so every target appears once
+assert len(set(mapped.values())) == len(mapped), "get_mapped_columns returned duplicate targets"
+assert 'Machine ID' not in mapped, "'Machine ID' should lose Equipment_Number to 'Equipment Number'"
+print("✅ No duplicate targets in mapping")
+
+skipped_cols = df.columns.difference(list(mapped), sort=False).tolist()
+if skipped_cols:
+    print(f"⚠️  Skipped unmapped/duplicate source columns: {skipped_cols}")
+
+# Select mapped source columns and label them with database names in one step
+df_mapped = df[list(mapped)].set_axis(list(mapped.values()), axis=1)
+print(f"✅ Selected columns - Shape: {df_mapped.shape}")
+print(f"✅ Selected columns - Columns: {list(df_mapped.columns)}")
 
 print(f"\nFinal DataFrame:")
 print(df_mapped)
\ No newline at end of file
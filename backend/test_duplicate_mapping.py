@@ -1,8 +1,13 @@
 import pandas as pd
+from openpyxl import load_workbook
 from app.utils.inspection_data_mapper import get_mapped_columns, INSPECTION_DATA_FIELD_MAPPING
 
-# Load test file
-df = pd.read_excel('test_duplicate_mapping.xlsx')
+# Load test file, streaming rows in read-only mode
+wb = load_workbook('test_duplicate_mapping.xlsx', read_only=True, data_only=True)
+rows = wb.active.iter_rows(values_only=True)
+header = next(rows)
+df = pd.DataFrame(list(rows), columns=header)
+wb.close()
 print("Original columns:", list(df.columns))
 
 # Get mapped columns
@@ -11,17 +16,14 @@ print(f"\nMapped columns ({len(mapped)}):")
 for excel_col, db_col in mapped.items():
     print(f"  {excel_col} -> {db_col}")
 
-# Rename columns according to mapping
-df_renamed = df.rename(columns=mapped)
-print(f"\nRenamed DataFrame columns: {list(df_renamed.columns)}")
+# get_mapped_columns keeps the first Excel column per database field,
+# so the targets must be unique even when the file has alternative headers
+assert len(set(mapped.values())) == len(mapped), "get_mapped_columns returned duplicate targets"
 
-# Check for duplicate columns after renaming
-duplicate_cols = df_renamed.columns[df_renamed.columns.duplicated()].tolist()
-if duplicate_cols:
-    print(f"❌ DUPLICATE COLUMNS FOUND: {duplicate_cols}")
-    print("This will cause SQL parameter duplication!")
-else:
-    print("✅ No duplicate columns after mapping")
+# Select mapped source columns and label them with database names in one step
+df_renamed = df[list(mapped)].set_axis(list(mapped.values()), axis=1)
+print(f"\nRenamed DataFrame columns: {list(df_renamed.columns)}")
+print("✅ No duplicate columns after mapping")
 
 print(f"\nDataFrame shape: {df_renamed.shape}")
 print(f"DataFrame preview:\n{df_renamed}")
\ No newline at end of file
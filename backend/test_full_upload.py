@@ -9,15 +9,20 @@ import os
 sys.path.append('/home/appuser/app')
 
 import pandas as pd
+import numpy as np
 from app.utils.inspection_data_mapper import get_mapped_columns, get_all_inspection_data_columns
 from app.utils.sql_server_connection import SQLServerConnection
 
+# Insertable InspectionData columns in database order (ID is auto-increment)
+DB_COLUMNS_WITHOUT_ID = tuple(col for col in get_all_inspection_data_columns() if col != 'ID')
+
 def test_full_upload():
     """Test inspection data upload with realistic Excel data"""
     
     # Create realistic test data matching Excel format
+    # (numeric columns are built with their database dtypes, so only dates need converting)
     test_data = {
-        'Inspection_ID': [119557, 119558, 119559, 119560, 119561],
+        'Inspection_ID': pd.array([119557, 119558, 119559, 119560, 119561], dtype='Int64'),
         'Machine_Type': ['komatsu', 'komatsu', 'komatsu', 'komatsu', 'komatsu'],
         'Model_Code': ['PC200-8', 'PC200-8', 'PC350-8', 'PC200-8', 'PC350-8'],
         'Serial_No': ['A12345', 'A12346', 'A12347', 'A12348', 'A12349'],
@@ -27,7 +32,7 @@ def test_full_upload():
         'Bushing_Spec': ['Standard', 'Standard', 'HD', 'Standard', 'HD'],
         'Track_Roller_Spec': ['Standard', 'Standard', 'HD', 'Standard', 'HD'],
         'Equipment_Number': ['EQ001', 'EQ002', 'EQ003', 'EQ004', 'EQ005'],
-        'SMR': [35250, 35300, 35400, 35500, 35600],
+        'SMR': pd.array([35250, 35300, 35400, 35500, 35600], dtype='Int64'),
         'Delivery_Date': ['2024-01-15', '2024-01-20', '2024-01-25', '2024-02-01', '2024-02-05'],
         'Inspection_Date': ['2024-12-01', '2024-12-02', '2024-12-03', '2024-12-04', '2024-12-05'],
         'Branch_Name': ['Jakarta', 'Jakarta', 'Surabaya', 'Jakarta', 'Surabaya'],
@@ -35,11 +40,11 @@ def test_full_upload():
         'Job_Site': ['Site A', 'Site B', 'Site C', 'Site D', 'Site E'],
         'Attachments': ['file1.pdf', 'file2.pdf', 'file3.pdf', 'file4.pdf', 'file5.pdf'],
         'Comments': ['Good condition', 'Minor wear', 'Replace soon', 'Excellent', 'Check next month'],
-        'WorkingHourPerDay': [8.0, 10.0, 12.0, 8.0, 10.0],
+        'WorkingHourPerDay': np.array([8.0, 10.0, 12.0, 8.0, 10.0]),
         'UnderfootConditions_Terrain': ['Rocky', 'Sandy', 'Clay', 'Rocky', 'Sandy'],
         'UnderfootConditions_Abrasive': ['High', 'Medium', 'Low', 'High', 'Medium'],
-        'Sprocket_PercentWorn_RHS': [25.5, 30.0, 45.5, 15.0, 35.5],
-        'Sprocket_PercentWorn_LHS': [26.0, 29.5, 46.0, 14.5, 36.0],
+        'Sprocket_PercentWorn_RHS': np.array([25.5, 30.0, 45.5, 15.0, 35.5]),
+        'Sprocket_PercentWorn_LHS': np.array([26.0, 29.5, 46.0, 14.5, 36.0]),
         'Sprocket_ReplaceDate_LHS': ['2024-06-01', '2024-07-15', '2024-03-20', '2024-08-10', '2024-05-25'],
         'Sprocket_ReplaceDate_RHS': ['2024-06-01', '2024-07-15', '2024-03-20', '2024-08-10', '2024-05-25']
     }
@@ -52,14 +57,13 @@ def test_full_upload():
     mapped = get_mapped_columns(df.columns.tolist())
     print(f"✅ Mapped {len(mapped)} out of {len(df.columns)} columns")
     
-    # Map columns
-    df_mapped = df.rename(columns=mapped)
+    # Map columns in place: this frame is owned by the test, so a renamed copy is not needed
+    df.columns = [mapped.get(col, col) for col in df.columns]
     
     # Get database columns and filter to existing ones (exclude ID)
-    all_db_columns = get_all_inspection_data_columns()
-    available_columns = set(df_mapped.columns)
-    final_columns = [col for col in all_db_columns if col in available_columns and col != 'ID']
-    df_final = df_mapped[final_columns]
+    available_columns = frozenset(df.columns)
+    final_columns = [col for col in DB_COLUMNS_WITHOUT_ID if col in available_columns]
+    df_final = df[final_columns]
     
     print(f"📊 Final DataFrame shape: {df_final.shape}")
     print(f"📊 Final columns ({len(final_columns)}): {final_columns[:10]}...")
@@ -67,26 +71,12 @@ def test_full_upload():
     # Convert data types
     print("🔄 Converting data types...")
     
-    # Integer columns
-    int_columns = ['Inspection_ID', 'SMR']
-    for col in int_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce').astype('Int64')
-            print(f"  ✅ Converted {col} to integer")
-    
-    # Date columns  
-    date_columns = ['Delivery_Date', 'Inspection_Date', 'Sprocket_ReplaceDate_LHS', 'Sprocket_ReplaceDate_RHS']
-    for col in date_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_datetime(df_final[col], errors='coerce')
-            print(f"  ✅ Converted {col} to datetime")
+    # Integer (Int64) and decimal (float64) columns are typed at construction; only dates need a pass
+    date_columns = [col for col in ['Delivery_Date', 'Inspection_Date', 'Sprocket_ReplaceDate_LHS', 'Sprocket_ReplaceDate_RHS'] if col in df_final.columns]
+    if date_columns:
+        df_final[date_columns] = df_final[date_columns].apply(pd.to_datetime, errors='coerce')
     
-    # Decimal columns  
-    decimal_columns = ['WorkingHourPerDay', 'Sprocket_PercentWorn_LHS', 'Sprocket_PercentWorn_RHS']
-    for col in decimal_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-            print(f"  ✅ Converted {col} to decimal")
+    print(f"  ✅ Converted {date_columns} to datetime")
     
     print(f"📊 Data types after conversion:")
     for col in df_final.columns[:10]:
@@ -96,14 +86,12 @@ def test_full_upload():
     try:
         sql_server = SQLServerConnection()
         
-        print("🗑️ Truncating InspectionData table...")
-        sql_server.truncate_table("InspectionData")
-        
-        print("💾 Inserting test data to database...")
+        print("💾 Truncating InspectionData and inserting test data in one transaction...")
         records_processed = sql_server.insert_dataframe_to_table(
             df_final, 
             "InspectionData", 
-            if_exists='append'
+            if_exists='append',
+            truncate=True
         )
         
         print(f"✅ SUCCESS! Inserted {records_processed} records successfully")
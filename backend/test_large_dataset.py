@@ -9,6 +9,42 @@ import numpy as np
 from app.utils.inspection_data_mapper import get_mapped_columns, get_all_inspection_data_columns
 from app.utils.sql_server_connection import sql_server
 
+# Database column order, fetched once for every test in this module
+_ALL_DB_COLUMNS = tuple(get_all_inspection_data_columns())
+
+# Sample first-row values for otherwise-NULL columns: exact names first, then substring
+# rules in priority order (e.g. 'TrackShoe_Width_Type' is a Type before it is a Width)
+_SAMPLE_EXACT = {
+    'UnderfootConditions_Terrain': 'High',
+    'UnderfootConditions_Abrasive': 'High',
+    'UnderfootConditions_Moisture': 'High',
+    'UnderfootConditions_Packing': 'High',
+    'ApplicationCode_Major': 'Mining',
+    'ApplicationCode_Minor': 'Mining',
+    'Application_Ground': 'Loading',
+    'Application_Working': 'Loading',
+}
+_SAMPLE_SUBSTRINGS = (
+    ('Brand', 'KOMATSU'),
+    ('PercentWorn', 75.5),
+    ('History_SMR', 6800),
+    ('History_Date', '2024-12-13'),
+    ('ReplaceDate', '2024-12-13'),
+    ('History_Hours', 3500.0),
+    ('Type', 'Standard'),
+    ('Width', 610.0),
+)
+
+def _sample_value(col):
+    """Sample value for the first row of an otherwise-NULL column (None when no rule applies)"""
+    value = _SAMPLE_EXACT.get(col)
+    if value is not None:
+        return value
+    for substring, value in _SAMPLE_SUBSTRINGS:
+        if substring in col:
+            return value
+    return None
+
 def create_large_test_dataset():
     """Create a larger test dataset similar to real data with many NULL columns"""
     
@@ -36,40 +72,18 @@ def create_large_test_dataset():
         'WorkingHourPerDay': [15.3] * rows,
     }
     
-    # Get all database columns
-    all_db_columns = get_all_inspection_data_columns()
-    
-    # Add columns that exist in database but not in base_data as NULL
-    for col in all_db_columns:
-        if col not in base_data and col != 'ID':
-            # Create mostly NULL columns with some random values
-            values = [None] * rows
-            
-            # Add some random non-NULL values for variety
-            if 'Brand' in col:
-                values[0] = 'KOMATSU'
-            elif 'PercentWorn' in col:
-                values[0] = 75.5
-            elif 'History_SMR' in col:
-                values[0] = 6800
-            elif 'History_Date' in col or 'ReplaceDate' in col:
-                values[0] = '2024-12-13'
-            elif 'History_Hours' in col:
-                values[0] = 3500.0
-            elif col in ['UnderfootConditions_Terrain', 'UnderfootConditions_Abrasive', 'UnderfootConditions_Moisture', 'UnderfootConditions_Packing']:
-                values[0] = 'High'
-            elif col in ['ApplicationCode_Major', 'ApplicationCode_Minor']:
-                values[0] = 'Mining'
-            elif col in ['Application_Ground', 'Application_Working']:
-                values[0] = 'Loading'
-            elif 'Type' in col:
-                values[0] = 'Standard'
-            elif 'Width' in col:
-                values[0] = 610.0
-                
-            base_data[col] = values
-    
-    return pd.DataFrame(base_data)
+    # Columns that exist in database but not in base_data start as NULL, in one 2D block
+    null_cols = [col for col in _ALL_DB_COLUMNS if col not in base_data and col != 'ID']
+    null_values = np.full((rows, len(null_cols)), None, dtype=object)
+    first_row = null_values[0]
+    
+    # Add some random non-NULL values for variety
+    for j, col in enumerate(null_cols):
+        first_row[j] = _sample_value(col)
+    
+    # infer_objects gives the numeric NULL columns float dtypes, as per-column lists would
+    null_df = pd.DataFrame(null_values, columns=null_cols).infer_objects()
+    return pd.concat([pd.DataFrame(base_data), null_df], axis=1)
 
 def test_large_dataset_upload():
     print("🧪 Testing large dataset upload (similar to real scenario)...")
@@ -83,9 +97,8 @@ def test_large_dataset_upload():
     print(f"✅ Mapped {len(mapped)} out of {len(df.columns)} columns")
     
     # Get database columns and prepare final dataset
-    all_db_columns = get_all_inspection_data_columns()
     available_columns = set(df.columns)
-    final_columns = [col for col in all_db_columns if col in available_columns and col != 'ID']
+    final_columns = [col for col in _ALL_DB_COLUMNS if col in available_columns and col != 'ID']
     df_final = df[final_columns].copy()
     
     print(f"📊 Final DataFrame shape: {df_final.shape}")
@@ -94,6 +107,9 @@ def test_large_dataset_upload():
     # Data type conversion (same as in upload.py)
     print("🔄 Converting data types...")
     
+    # Column membership for all three type groups, computed once
+    present_cols = frozenset(final_columns)
+    
     # Integer columns
     int_columns = ['Inspection_ID', 'SMR', 
                   'LinkPitch_History_SMR_LHS', 'LinkPitch_History_SMR_RHS',
@@ -103,9 +119,10 @@ def test_large_dataset_upload():
                   'Idlers_History_SMR_LHS1', 'Idlers_History_SMR_RHS1',
                   'Sprocket_History_SMR_LHS', 'Sprocket_History_SMR_RHS']
     
-    for col in int_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce').astype('Int64')
+    # Convert every integer column as one sub-frame instead of reassigning column by column
+    present_int_cols = [col for col in int_columns if col in present_cols]
+    if present_int_cols:
+        df_final[present_int_cols] = df_final[present_int_cols].apply(pd.to_numeric, errors='coerce').astype('Int64')
     
     # Date columns
     date_columns = ['Delivery_Date', 'Inspection_Date',
@@ -122,9 +139,13 @@ def test_large_dataset_upload():
                    'Sprocket_History_Date_LHS', 'Sprocket_History_Date_RHS',
                    'Sprocket_ReplaceDate_LHS', 'Sprocket_ReplaceDate_RHS']
     
-    for col in date_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_datetime(df_final[col], errors='coerce')
+    # Parse every date column in one call: stack them into a single Series so the
+    # datetime cache dedupes repeated strings across columns, then reshape back
+    present_date_cols = [col for col in date_columns if col in present_cols]
+    if present_date_cols:
+        stacked = pd.concat([df_final[col] for col in present_date_cols], ignore_index=True)
+        parsed = pd.to_datetime(stacked, errors='coerce', cache=True, format='ISO8601')
+        df_final[present_date_cols] = parsed.to_numpy().reshape(len(present_date_cols), -1).T
     
     # Decimal columns
     decimal_columns = ['WorkingHourPerDay', 'TrackShoe_Width',
@@ -141,77 +162,49 @@ def test_large_dataset_upload():
                       'Sprocket_History_Hours_LHS', 'Sprocket_History_Hours_RHS',
                       'Sprocket_PercentWorn_LHS', 'Sprocket_PercentWorn_RHS']
     
-    for col in decimal_columns:
-        if col in df_final.columns:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+    present_decimal_cols = [col for col in decimal_columns if col in present_cols]
+    if present_decimal_cols:
+        df_final[present_decimal_cols] = df_final[present_decimal_cols].apply(pd.to_numeric, errors='coerce')
     
     print("✅ Data type conversion completed")
     
     # NULL value handling (same as in updated upload.py)
     print("🧹 Cleaning NULL values for pyodbc compatibility...")
     
-    for col in df_final.columns:
-        if df_final[col].dtype == 'datetime64[ns]':
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-        elif str(df_final[col].dtype).startswith('Int'):
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-        elif df_final[col].dtype in ['float64', 'float32']:
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-        elif df_final[col].dtype == 'object':
-            df_final[col] = df_final[col].where(pd.notna(df_final[col]), None)
-    
-    # Convert numpy types to native Python types
+    # One frame-level pass: every column becomes native Python objects and every
+    # NaN/NaT/<NA> becomes None (the same conversion the insert layer applies)
     print("🔧 Converting numpy types to native Python types...")
     
-    for col in df_final.columns:
-        if str(df_final[col].dtype).startswith('Int'):
-            df_final[col] = df_final[col].apply(lambda x: int(x) if pd.notna(x) and x is not None else None)
-        elif df_final[col].dtype in ['float64', 'float32']:
-            df_final[col] = df_final[col].apply(lambda x: float(x) if pd.notna(x) and x is not None else None)
-        elif df_final[col].dtype in ['int64', 'int32']:
-            df_final[col] = df_final[col].apply(lambda x: int(x) if pd.notna(x) and x is not None else None)
+    df_final = df_final.astype(object).where(df_final.notna(), None)
     
     print("✅ NULL value handling and type conversion completed")
     
     # Count NULLs in final dataset
-    null_counts = {}
-    for col in df_final.columns:
-        null_count = sum(1 for x in df_final[col] if x is None)
-        if null_count > 0:
-            null_counts[col] = null_count
+    counts = df_final.isna().sum(axis=0)
+    null_counts = counts[counts > 0].to_dict()
     
     print(f"\n📈 Final NULL counts: {len(null_counts)} columns have NULLs")
     print(f"📈 Total NULL values: {sum(null_counts.values())}")
     
     # Show sample of first row parameters
     print(f"\n🔍 Sample of first row parameters (first 10):")
-    first_row = df_final.iloc[0]
-    params = tuple(first_row.values)
+    params = next(df_final.itertuples(index=False, name=None))
     for i, param in enumerate(params[:10]):
         print(f"  [{i}] {type(param)} = {repr(param)}")
     
     # Test database insert
     print(f"\n💾 Testing database insert with {len(df_final)} rows and {len(df_final.columns)} columns...")
     try:
-        if sql_server.test_connection():
-            print("✅ Database connection successful")
-            
-            # Truncate table
-            print("🗑️ Truncating InspectionData table...")
-            sql_server.truncate_table('InspectionData')
-            
-            # Insert data
-            records_inserted = sql_server.insert_dataframe_to_table(
-                df_final, 
-                'InspectionData',
-                if_exists='append'
-            )
-            
-            print(f"🎉 SUCCESS! Inserted {records_inserted} records with large dataset!")
-            
-        else:
-            print("❌ Database connection failed")
-            
+        # Truncate and insert in one connection/transaction; a connection failure raises below
+        records_inserted = sql_server.insert_dataframe_to_table(
+            df_final, 
+            'InspectionData',
+            if_exists='append',
+            truncate=True
+        )
+        
+        print(f"🎉 SUCCESS! Inserted {records_inserted} records with large dataset!")
+        
     except Exception as e:
         print(f"❌ Database operation failed: {e}")
         print(f"Error type: {type(e)}")
@@ -18,16 +18,19 @@ from app.utils.metadata import (
     get_file_metadata, 
     get_all_uploads_metadata,
     remove_upload_metadata,
-    METADATA_FILE_PATH
+    flush_metadata,
+    METADATA_FILE_PATH,
+    METADATA_LOG_PATH
 )
 
 def test_metadata_functionality():
     """Test the metadata functionality."""
     print("Testing metadata functionality...")
     
-    # Clean up any existing metadata file for testing
-    if METADATA_FILE_PATH.exists():
-        METADATA_FILE_PATH.unlink()
+    # Clean up any existing metadata files for testing
+    for path in (METADATA_FILE_PATH, METADATA_LOG_PATH):
+        if path.exists():
+            path.unlink()
     
     # Test 1: Add metadata for a test file
     print("\n1. Testing add_upload_metadata...")
@@ -74,7 +77,8 @@ def test_metadata_functionality():
     result = remove_upload_metadata("nonexistent.jpg")
     print(f"Remove result for nonexistent.jpg: {result}")
     
-    # Verify final metadata file exists
+    # Write the journaled changes to the metadata file and verify it exists
+    flush_metadata()
     print(f"\n8. Final verification - metadata file exists: {METADATA_FILE_PATH.exists()}")
     if METADATA_FILE_PATH.exists():
         with open(METADATA_FILE_PATH, 'r') as f:
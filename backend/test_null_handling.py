@@ -34,19 +34,9 @@ def test_null_handling():
     # Convert NULL handling
     print("\n🔄 Converting NULL values for pyodbc...")
     
-    # Replace pandas NaT and None with proper NULL
-    for col in df.columns:
-        # Replace pandas NaT (Not a Time) with None
-        if df[col].dtype == 'datetime64[ns]':
-            df[col] = df[col].where(pd.notna(df[col]), None)
-        
-        # Replace NaN with None for numeric columns
-        elif df[col].dtype in ['float64', 'Int64']:
-            df[col] = df[col].where(pd.notna(df[col]), None)
-        
-        # Ensure string None stays as None
-        elif df[col].dtype == 'object':
-            df[col] = df[col].where(pd.notna(df[col]), None)
+    # Replace NaN/NaT/None with proper NULL across every column in one frame-level pass;
+    # astype(object) also turns numpy scalars into native Python values
+    df = df.astype(object).where(df.notna(), None)
     
     print("\n📊 After NULL conversion:")
     for col in df.columns:
@@ -55,8 +45,7 @@ def test_null_handling():
     
     # Test parameter creation
     print("\n🧪 Testing parameter creation...")
-    row = df.iloc[0]
-    params = tuple(row.values)
+    params = next(df.itertuples(index=False, name=None))
     
     print(f"Parameters count: {len(params)}")
     for i, param in enumerate(params):
@@ -69,7 +58,7 @@ def test_null_handling():
         
         # Create a simple test table query
         columns = list(df.columns)
-        placeholders = ', '.join(['?' for _ in columns])
+        placeholders = ', '.join('?' * len(columns))
         sql = f"SELECT {placeholders}"
         
         print(f"SQL: {sql}")
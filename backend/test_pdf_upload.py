@@ -16,6 +16,8 @@ from pathlib import Path
 import json
 from fastapi.testclient import TestClient
 from app.main import app
+from app.utils import metadata as metadata_store
+from app.utils.metadata import flush_metadata
 
 # Test client for FastAPI app
 client = TestClient(app)
@@ -84,41 +86,25 @@ startxref
 # Invalid PDF content (not starting with %PDF-)
 INVALID_PDF_CONTENT = b"This is not a PDF file content"
 
+# Expected MD5 hashes of the sample PDFs, computed once for all tests
+SAMPLE_PDF_HASH = hashlib.md5(SAMPLE_PDF_CONTENT).hexdigest()
+SAMPLE_PDF_HASH_2 = hashlib.md5(SAMPLE_PDF_CONTENT_2).hexdigest()
+
 class TestPDFUpload:
     """Test class for PDF upload functionality."""
     
-    def setup_method(self):
-        """Setup method run before each test."""
-        # Ensure documents directory exists
-        DOCUMENTS_DIR.mkdir(exist_ok=True)
-        
-        # Clean up any existing test files
-        self.cleanup_test_files()
-        
-        # Clean up metadata
-        if METADATA_FILE.exists():
-            METADATA_FILE.unlink()
-    
-    def teardown_method(self):
-        """Cleanup method run after each test."""
-        self.cleanup_test_files()
-        
-        # Clean up metadata
-        if METADATA_FILE.exists():
-            METADATA_FILE.unlink()
-    
-    def cleanup_test_files(self):
-        """Remove any test PDF files from documents directory."""
-        if DOCUMENTS_DIR.exists():
-            for file in DOCUMENTS_DIR.glob("*.pdf"):
-                try:
-                    file.unlink()
-                except OSError:
-                    pass
-    
-    def calculate_md5(self, content: bytes) -> str:
-        """Calculate MD5 hash of content."""
-        return hashlib.md5(content).hexdigest()
+    @pytest.fixture(autouse=True)
+    def isolated_storage(self, tmp_path, monkeypatch):
+        """Run each test in a fresh directory with an empty documents folder."""
+        # DOCUMENTS_DIR and the metadata file are relative paths, so
+        # switching the working directory gives every test clean storage
+        # and pytest removes it afterwards; the in-memory uploads metadata
+        # is dropped too so it is loaded from the new directory
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(metadata_store, "_uploads", None)
+        monkeypatch.setattr(metadata_store, "_metadata_json", None)
+        DOCUMENTS_DIR.mkdir()
+        yield
     
     def test_successful_pdf_upload(self):
         """Test successful upload of a valid PDF file."""
@@ -152,6 +138,7 @@ class TestPDFUpload:
         assert saved_content == SAMPLE_PDF_CONTENT
         
         # Check metadata was created
+        flush_metadata()
         assert METADATA_FILE.exists()
         with open(METADATA_FILE, "r") as f:
             metadata = json.load(f)
@@ -199,9 +186,7 @@ class TestPDFUpload:
         assert len(pdf_files) == 2
         
         # Verify different hashes
-        hash1 = self.calculate_md5(SAMPLE_PDF_CONTENT)
-        hash2 = self.calculate_md5(SAMPLE_PDF_CONTENT_2)
-        assert hash1 != hash2
+        assert SAMPLE_PDF_HASH != SAMPLE_PDF_HASH_2
     
     def test_invalid_file_extension(self):
         """Test rejection of files with non-PDF extensions."""
@@ -270,6 +255,7 @@ class TestPDFUpload:
         assert len(pdf_files) == 2
         
         # Check metadata
+        flush_metadata()
         with open(METADATA_FILE, "r") as f:
             metadata = json.load(f)
         assert len(metadata["uploads"]) == 2
@@ -323,7 +309,7 @@ class TestPDFUpload:
         
         data = response.json()
         returned_hash = data["file"]["file_hash"]
-        expected_hash = self.calculate_md5(SAMPLE_PDF_CONTENT)
+        expected_hash = SAMPLE_PDF_HASH
         
         assert returned_hash == expected_hash
         